@@ -216,6 +216,12 @@ class Dispatcher(Base):
         #: Counter to set the node index.
         self.counter = counter()
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for k in ('_des_index', '_node_index'):
+            state.pop(k, None)  # Cached indices are rebuilt on demand.
+        return state
+
     def copy_structure(self, **kwargs):
         _map = {
             'description': '__doc__', 'name': 'name', 'stopper': 'stopper',
@@ -343,6 +349,33 @@ class Dispatcher(Base):
             'unknown'
         """
 
+        data_id, attr_dict, default = self._data_node(
+            data_id, default_value, initial_dist, wait_inputs, wildcard,
+            function, callback, remote_links, description, filters, **kwargs
+        )
+
+        # Add node to the dispatcher map.
+        self.dmap.add_node(data_id, attr_dict=attr_dict)
+
+        from .utils.alg import update_version
+        update_version(self)  # Cached indices depend on the nodes.
+
+        # Set default value.
+        self.set_default_value(data_id, *default)
+
+        return data_id  # Return data node id.
+
+    def _data_node(self, data_id=None, default_value=EMPTY, initial_dist=0.0,
+                   wait_inputs=False, wildcard=None, function=None,
+                   callback=None, remote_links=None, description=None,
+                   filters=None, **kwargs):
+        """
+        Returns the id, the attributes, and the default value (and its initial
+        distance) of a new data node, without adding it to the dispatcher.
+
+        .. seealso:: :func:`add_data`
+        """
+
         # Set special data nodes.
         if data_id is START:
             default_value, description = NONE, START.__doc__
@@ -393,13 +426,7 @@ class Dispatcher(Base):
             raise ValueError('Invalid data id: '
                              'override function {}'.format(data_id))
 
-        # Add node to the dispatcher map.
-        self.dmap.add_node(data_id, attr_dict=attr_dict)
-
-        # Set default value.
-        self.set_default_value(data_id, default_value, initial_dist)
-
-        return data_id  # Return data node id.
+        return data_id, attr_dict, (default_value, initial_dist)
 
     def add_function(self, function_id=None, function=None, inputs=None,
                      outputs=None, input_domain=None, weight=None,
@@ -513,6 +540,35 @@ class Dispatcher(Base):
 
             outputs = [SINK]  # Update outputs.
 
+        fun_id, attr_dict = self._function_node(
+            function_id, function, inputs, outputs, input_domain, weight,
+            description, filters, **kwargs
+        )
+
+        # Add node to the dispatcher map.
+        self.dmap.add_node(fun_id, attr_dict=attr_dict)
+
+        from .utils.alg import update_version
+        update_version(self)  # Cached indices depend on the nodes.
+
+        from .utils.alg import add_func_edges  # Add input edges.
+        n_data = add_func_edges(self, fun_id, inputs, inp_weight, True)
+
+        # Add output edges.
+        add_func_edges(self, fun_id, outputs, out_weight, False, n_data)
+
+        return fun_id  # Return function node id.
+
+    def _function_node(self, function_id=None, function=None, inputs=None,
+                       outputs=None, input_domain=None, weight=None,
+                       description=None, filters=None, **kwargs):
+        """
+        Returns the id and the attributes of a new function node, without
+        adding it (and its edges) to the dispatcher.
+
+        .. seealso:: :func:`add_function`
+        """
+
         # Get parent function.
         func = parent_func(function)
 
@@ -553,16 +609,7 @@ class Dispatcher(Base):
 
         attr_dict.update(kwargs)  # Set additional attributes.
 
-        # Add node to the dispatcher map.
-        self.dmap.add_node(fun_id, attr_dict=attr_dict)
-
-        from .utils.alg import add_func_edges  # Add input edges.
-        n_data = add_func_edges(self, fun_id, inputs, inp_weight, True)
-
-        # Add output edges.
-        add_func_edges(self, fun_id, outputs, out_weight, False, n_data)
-
-        return fun_id  # Return function node id.
+        return fun_id, attr_dict
 
     def add_dispatcher(self, dsp, inputs, outputs, dsp_id=None,
                        input_domain=None, weight=None, inp_weight=None,
@@ -726,7 +773,8 @@ class Dispatcher(Base):
 
         return dsp_id  # Return sub-dispatcher node id.
 
-    def add_from_lists(self, data_list=None, fun_list=None, dsp_list=None):
+    def add_from_lists(self, data_list=None, fun_list=None, dsp_list=None,
+                       bulk=False):
         """
         Add multiple function and data nodes to dispatcher.
 
@@ -742,6 +790,14 @@ class Dispatcher(Base):
             It is a list of sub-dispatcher node kwargs to be loaded.
         :type dsp_list: list[dict], optional
 
+        :param bulk:
+            If True, the node ids are assigned in one pass with a per-prefix
+            counter, the node links are validated before adding any node, and
+            the data and function nodes are inserted in the dispatcher map
+            with a single `add_nodes_from`/`add_edges_from`. It is suggested
+            for very large (generated) models.
+        :type bulk: bool, optional
+
         :returns:
 
             - Data node ids.
@@ -792,8 +848,25 @@ class Dispatcher(Base):
 
             >>> dsp.add_from_lists(data_list, fun_list, dsp_list)
             (['a', 'b', 'c'], ['func'], ['Sub'])
+
+        Add many nodes with the same name in bulk mode::
+
+            >>> fun_list = [{'function': func, 'inputs': ['a', 'b'],
+            ...              'outputs': ['c']}] * 3
+            >>> dsp.add_from_lists(fun_list=fun_list, bulk=True)
+            ([], ['func<0>', 'func<1>', 'func<2>'], [])
         """
 
+        if bulk:  # Assign node ids and validate the lists.
+            from .utils.alg import _set_bulk_node_ids, _add_bulk_nodes
+            data_list, fun_list, dsp_list = _set_bulk_node_ids(
+                self, data_list, fun_list, dsp_list
+            )
+            # Add data and function nodes.
+            data_ids, fun_ids = _add_bulk_nodes(self, data_list, fun_list)
+            dsp_ids = [self.add_dispatcher(**v) for v in dsp_list]  # Dsp ids.
+            return data_ids, fun_ids, dsp_ids
+
         if data_list:  # Add data nodes.
             data_ids = [self.add_data(**v) for v in data_list]  # Data ids.
         else:
@@ -1012,6 +1085,9 @@ class Dispatcher(Base):
         # Remove isolate nodes from sub-graph.
         sub_dsp.dmap.remove_nodes_from(isolates(sub_dsp.dmap))
 
+        from .utils.alg import update_version
+        update_version(sub_dsp)  # Nodes have been removed.
+
         # Set default values.
         sub_dsp.default_values = {k: dmap_dv[k] for k in dmap_dv if k in nodes}
 
@@ -1268,7 +1344,8 @@ class Dispatcher(Base):
         import copy
         return copy.deepcopy(self)  # Return the copy of the Dispatcher.
 
-    def web(self, import_name=None, **options):
+    def web(self, import_name=None, workers=None, max_queue=None, stream=False,
+            lazy=False, cache=None, metrics=False, **options):
         """
         Creates a dispatcher Flask app.
 
@@ -1276,6 +1353,33 @@ class Dispatcher(Base):
             The name of the application package.
         :type import_name: str, optional
 
+        :param workers:
+            Number of worker threads that execute the requests.
+        :type workers: int, optional
+
+        :param max_queue:
+            Maximum number of requests waiting for a worker (HTTP 503 when
+            saturated).
+        :type max_queue: int, optional
+
+        :param stream:
+            Stream the dispatch responses as newline-delimited JSON records?
+        :type stream: bool, optional
+
+        :param lazy:
+            Resolve the node rules on demand instead of registering all of them?
+        :type lazy: bool, optional
+
+        :param cache:
+            Response cache, keyed by rule and request JSON (HTTP 304 for a
+            matching `If-None-Match`).
+        :type cache: schedula.utils.web.ResponseCache, optional
+
+        :param metrics:
+            Add a `/metrics` route with the runtime statistics? It can be also
+            a :class:`schedula.utils.web.Metrics` instance.
+        :type metrics: bool | schedula.utils.web.Metrics, optional
+
         :param options:
             Flask options.
         :type options: dict, optional
@@ -1286,7 +1390,11 @@ class Dispatcher(Base):
         """
 
         from .utils.web import create_flask_app
-        return create_flask_app(self, import_name=import_name, **options)
+        return create_flask_app(
+            self, import_name=import_name, workers=workers,
+            max_queue=max_queue, stream=stream, lazy=lazy, cache=cache,
+            metrics=metrics, **options
+        )
 
     def dispatch(self, inputs=None, outputs=None, cutoff=None, inputs_dist=None,
                  wildcard=False, no_call=False, shrink=False,
@@ -6,9 +6,214 @@ from sphinx.ext.autosummary.generate import *
 from sphinx.ext.autosummary.generate import _simple_warn, _simple_info
 
 
+def get_members(obj, typ, include_public=(), imported=False):
+    items = []
+    for name in dir(obj):
+        try:
+            obj_name = safe_getattr(obj, name)
+            documenter = get_documenter(obj_name, obj)
+        except AttributeError:
+            continue
+        if documenter.objtype == typ:
+            try:
+                cond = imported or obj_name.__module__ == obj.__name__
+
+            except AttributeError:
+                cond = True
+
+            if cond:
+                items.append(name)
+    public = [x for x in items
+              if x in include_public or not x.startswith('_')]
+    return public, items
+
+
+def get_namespace(name):
+    """
+    Imports an object and returns the template namespace of its stub.
+
+    :param name:
+        Full name of the object.
+    :type name: str
+
+    :return:
+        Full name, documenter type, template namespace, and the modules that
+        define the inherited members.
+    :rtype: (str, str, dict, list[str])
+    """
+    name, obj, parent, mod_name = import_by_name(name)
+    doc = get_documenter(obj, parent)
+    ns = {}
+
+    mro = getattr(obj, '__mro__', None) or getattr(parent, '__mro__', ())
+    modules = sorted({getattr(c, '__module__', None) or '' for c in mro} -
+                     {'', 'builtins'})
+
+    if doc.objtype == 'module':
+        ns['members'] = dir(obj)
+        ns['functions'], ns['all_functions'] = \
+            get_members(obj, 'function')
+        ns['classes'], ns['all_classes'] = \
+            get_members(obj, 'class')
+        ns['exceptions'], ns['all_exceptions'] = \
+            get_members(obj, 'exception')
+        ns['data'], ns['all_data'] = \
+            get_members(obj, 'data', imported=True)
+
+        ns['data'] = ', '.join(ns['data'])
+        ns['all_data'] = ', '.join(ns['all_data'])
+
+        ns['dispatchers'], ns['all_dispatchers'] = \
+            get_members(obj, 'dispatcher', imported=True)
+    elif doc.objtype == 'class':
+        ns['members'] = dir(obj)
+        ns['methods'], ns['all_methods'] = \
+            get_members(obj, 'method', ['__init__'], True)
+        ns['attributes'], ns['all_attributes'] = \
+            get_members(obj, 'attribute')
+
+    parts = name.split('.')
+    if doc.objtype in ('method', 'attribute'):
+        mod_name = '.'.join(parts[:-2])
+        cls_name = parts[-2]
+        obj_name = '.'.join(parts[-2:])
+        ns['class'] = cls_name
+    else:
+        mod_name, obj_name = '.'.join(parts[:-1]), parts[-1]
+
+    ns['fullname'] = name
+    ns['module'] = mod_name
+    ns['objname'] = obj_name
+    ns['name'] = parts[-1]
+
+    ns['objtype'] = doc.objtype
+    ns['underline'] = len(name) * '='
+    return name, doc.objtype, ns, modules
+
+
+def _get_namespace(name):
+    try:
+        return get_namespace(name)
+    except ImportError as e:
+        return e
+
+
+def find_source(name):
+    """
+    Finds, without importing it, the source file of the module that defines
+    an object.
+
+    :param name:
+        Full name of the object.
+    :type name: str
+
+    :return:
+        Source file path or None if it is not found.
+    :rtype: str
+    """
+    parts = name.split('.')
+    for path in sys.path:
+        path, res = os.path.abspath(path or '.'), None
+        for part in parts:
+            path = os.path.join(path, part)
+            if os.path.isfile(path + '.py'):
+                res = path + '.py'
+                break
+            init = os.path.join(path, '__init__.py')
+            if not os.path.isfile(init):
+                break
+            res = init
+        if res:
+            return res
+
+
+def _template_source(template_env, template_name):
+    try:
+        return template_env.loader.get_source(template_env, template_name)[0]
+    except TemplateNotFound:
+        return ''
+
+
+def _fingerprint(name, template_name, template_source, modules=()):
+    import hashlib
+    key = hashlib.sha1(('%s:%s:' % (name, template_name)).encode('utf-8'))
+    key.update(template_source.encode('utf-8'))
+    for i, mod in enumerate([name] + list(modules)):
+        fpath = find_source(mod)
+        if fpath is None:
+            if not i:
+                return None
+            continue
+        key.update(('\n%s:' % mod).encode('utf-8'))
+        with open(fpath, 'rb') as f:
+            key.update(f.read())
+    return key.hexdigest()
+
+
+def _is_unchanged(entry, name, template_name, template_env):
+    # The entry is [declared template, used template, modules, fingerprint].
+    if not isinstance(entry, list) or len(entry) != 4 or \
+            entry[0] != template_name:
+        return False
+    source = _template_source(template_env, entry[1])
+    return entry[3] == _fingerprint(name, entry[1], source, entry[2])
+
+
+class _Manifest(dict):
+    # Source fingerprints of the generated stubs, stored in their folder.
+    filename = '.autosummary.json'
+
+    def __init__(self):
+        super(_Manifest, self).__init__()
+        self.changed = set()
+
+    def __missing__(self, path):
+        import json
+        try:
+            with open(os.path.join(path, self.filename)) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        self[path] = data
+        return data
+
+    def get_fingerprint(self, fn):
+        return self[os.path.dirname(fn)].get(os.path.basename(fn))
+
+    def set_fingerprint(self, fn, fingerprint):
+        path = os.path.dirname(fn)
+        self[path][os.path.basename(fn)] = fingerprint
+        self.changed.add(path)
+
+    def dump(self):
+        import json
+        import tempfile
+        for path in self.changed:
+            fd, tmp = tempfile.mkstemp(dir=path)
+            with os.fdopen(fd, 'w') as f:
+                json.dump(self[path], f, indent=1, sort_keys=True)
+            os.replace(tmp, os.path.join(path, self.filename))
+        self.changed.clear()
+
+
 def generate_autosummary_docs(sources, output_dir=None, suffix='.rst',
                               warn=_simple_warn, info=_simple_info,
-                              base_path=None, builder=None, template_dir=None):
+                              base_path=None, builder=None, template_dir=None,
+                              processes=None, _manifest=None):
+    """
+    Generates the autosummary stub files.
+
+    Stubs are regenerated only when their template, the source file of their
+    module, or the source files of the modules that define their inherited
+    members have changed since they were generated (i.e., unchanged stubs are
+    skipped without importing their objects), while stubs that were not
+    generated by this function are never overwritten.
+
+    :param processes:
+        Number of worker processes that import the objects. If None, they are
+        imported in the current process.
+    :type processes: int, optional
+    """
     showed_sources = list(sorted(sources))
     if len(showed_sources) > 20:
         showed_sources = showed_sources[:10] + ['...'] + showed_sources[-10:]
@@ -40,10 +245,10 @@ def generate_autosummary_docs(sources, output_dir=None, suffix='.rst',
     # remove possible duplicates
     items = list(dict([(item, True) for item in items]).keys())
 
-    # keep track of new files
-    new_files = []
+    # keep track of new and unchanged files
+    new_files, unchanged_files, todo = [], [], []
+    manifest = _Manifest() if _manifest is None else _manifest
 
-    # write
     for name, path, template_name in sorted(items, key=str):
         if path is None:
             # The corresponding autosummary:: directive did not have
@@ -53,108 +258,61 @@ def generate_autosummary_docs(sources, output_dir=None, suffix='.rst',
         path = output_dir or os.path.abspath(path)
         ensuredir(path)
 
-        try:
-            name, obj, parent, mod_name = import_by_name(name)
-        except ImportError as e:
-            warn('[autosummary] failed to import %r: %s' % (name, e))
-            continue
-
         fn = os.path.join(path, name + suffix)
-
-        # skip it if it exists
         if os.path.isfile(fn):
+            entry = manifest.get_fingerprint(fn)
+            # skip it if it exists and it was not generated or is unchanged
+            if entry is None:
+                continue
+            if _is_unchanged(entry, name, template_name, template_env):
+                unchanged_files.append(fn)
+                continue
+        todo.append((name, fn, template_name))
+
+    # import
+    names = [name for name, fn, template_name in todo]
+    if processes and len(names) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(processes) as executor:
+            namespaces = list(executor.map(_get_namespace, names))
+    else:
+        namespaces = map(_get_namespace, names)
+
+    # write
+    for (name, fn, template_name), res in zip(todo, namespaces):
+        if isinstance(res, ImportError):
+            warn('[autosummary] failed to import %r: %s' % (name, res))
             continue
 
         new_files.append(fn)
-
-        f = open(fn, 'w')
-
-        try:
-            doc = get_documenter(obj, parent)
-
-            if template_name is not None:
-                template = template_env.get_template(template_name)
-            else:
-                try:
-                    template = template_env.get_template('autosummary/%s.rst'
-                                                         % doc.objtype)
-                except TemplateNotFound:
-                    template = template_env.get_template('autosummary/base.rst')
-
-            def get_members(obj, typ, include_public=[], imported=False):
-                items = []
-                for name in dir(obj):
-                    try:
-                        obj_name = safe_getattr(obj, name)
-                        documenter = get_documenter(obj_name, obj)
-                    except AttributeError:
-                        continue
-                    if documenter.objtype == typ:
-                        try:
-                            cond = imported or obj_name.__module__ == obj.__name__
-
-                        except AttributeError:
-                            cond = True
-
-                        if cond:
-                            items.append(name)
-                public = [x for x in items
-                          if x in include_public or not x.startswith('_')]
-                return public, items
-
-            ns = {}
-
-            if doc.objtype == 'module':
-                ns['members'] = dir(obj)
-                ns['functions'], ns['all_functions'] = \
-                    get_members(obj, 'function')
-                ns['classes'], ns['all_classes'] = \
-                    get_members(obj, 'class')
-                ns['exceptions'], ns['all_exceptions'] = \
-                    get_members(obj, 'exception')
-                ns['data'], ns['all_data'] = \
-                    get_members(obj, 'data', imported=True)
-
-                ns['data'] = ', '.join(ns['data'])
-                ns['all_data'] = ', '.join(ns['all_data'])
-
-                ns['dispatchers'], ns['all_dispatchers'] = \
-                    get_members(obj, 'dispatcher', imported=True)
-            elif doc.objtype == 'class':
-                ns['members'] = dir(obj)
-                ns['methods'], ns['all_methods'] = \
-                    get_members(obj, 'method', ['__init__'], True)
-                ns['attributes'], ns['all_attributes'] = \
-                    get_members(obj, 'attribute')
-
-            parts = name.split('.')
-            if doc.objtype in ('method', 'attribute'):
-                mod_name = '.'.join(parts[:-2])
-                cls_name = parts[-2]
-                obj_name = '.'.join(parts[-2:])
-                ns['class'] = cls_name
-            else:
-                mod_name, obj_name = '.'.join(parts[:-1]), parts[-1]
-
-            ns['fullname'] = name
-            ns['module'] = mod_name
-            ns['objname'] = obj_name
-            ns['name'] = parts[-1]
-
-            ns['objtype'] = doc.objtype
-            ns['underline'] = len(name) * '='
-
-            rendered = template.render(**ns)
-            f.write(rendered)
-        finally:
-            f.close()
-
-    # descend recursively to new files
-    if new_files:
-        generate_autosummary_docs(new_files, output_dir=output_dir,
-                                  suffix=suffix, warn=warn, info=info,
-                                  base_path=base_path, builder=builder,
-                                  template_dir=template_dir)
+        name, objtype, ns, modules = res
+
+        tname = template_name
+        if tname is None:
+            tname = 'autosummary/%s.rst' % objtype
+            try:
+                template_env.get_template(tname)
+            except TemplateNotFound:
+                tname = 'autosummary/base.rst'
+        template = template_env.get_template(tname)
+
+        with open(fn, 'w') as f:
+            f.write(template.render(**ns))
+        source = _template_source(template_env, tname)
+        manifest.set_fingerprint(fn, [
+            template_name, tname, modules,
+            _fingerprint(name, tname, source, modules)
+        ])
+
+    # descend recursively to new and unchanged files
+    if new_files or unchanged_files:
+        generate_autosummary_docs(new_files + unchanged_files,
+                                  output_dir=output_dir, suffix=suffix,
+                                  warn=warn, info=info, base_path=base_path,
+                                  builder=builder, template_dir=template_dir,
+                                  processes=processes, _manifest=manifest)
+    if _manifest is None:
+        manifest.dump()
 
 
 def process_generate_options(app):
@@ -174,9 +332,11 @@ def process_generate_options(app):
 
     generate_autosummary_docs(genfiles, builder=app.builder,
                               warn=app.warn, info=app.info, suffix=ext,
-                              base_path=app.srcdir)
+                              base_path=app.srcdir,
+                              processes=app.config.autosummary_processes)
 
 
 def setup(app):
     app.setup_extension('sphinx.ext.autosummary')
+    app.add_config_value('autosummary_processes', None, 'env')
     app.connect('builder-inited', process_generate_options)
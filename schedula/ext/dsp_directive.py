@@ -1,5 +1,7 @@
 import schedula.utils as dsp_utl
+import os
 import shutil
+import tempfile
 import os.path as osp
 from sphinx.ext.autodoc import *
 from sphinx.ext.graphviz import *
@@ -107,21 +109,53 @@ def _code(lines, documenter):
         lines.append('')
 
 
+def _plot_key(smap):
+    from schedula.utils.drw import SiteFolder, dot_cache_key
+    context, key = smap.rules(index=False), sha1()
+    for (node, extra), fpath in context.items():
+        key.update(fpath.encode('utf-8'))
+        if isinstance(node, SiteFolder):
+            key.update(dot_cache_key(node.dot(context)))
+        elif extra is None:
+            key.update(node.render(context).encode('utf-8'))
+    return key.hexdigest()
+
+
+def _atomic_move(src, dst):
+    for root, _, files in os.walk(src):
+        folder = osp.join(dst, osp.relpath(root, src))
+        os.makedirs(folder, exist_ok=True)
+        for f in files:
+            os.replace(osp.join(root, f), osp.join(folder, f))
+
+
 def _plot(lines, dsp, dot_view_opt, documenter):
-    hashkey = (documenter.modname + str(documenter.code) +
-               str(sorted(dot_view_opt.items()))).encode('utf-8')
-    fname = 'dispatcher-%s' % sha1(hashkey).hexdigest()
+    smap = dsp.plot(**dot_view_opt)
+    folder = next(iter(smap))
+    folder._name = folder.sitemap.foldername = 'dispatcher'
+    # The key depends on the DOT source of all pages (graphviz is not called),
+    # so unchanged plots are not rendered again.
+    fname = 'dispatcher-%s' % _plot_key(smap)
     env = documenter.env
 
     dspdir = osp.join(env.srcdir, env.config.dispatchers_out_dir)
     fpath = '%s.gv' % osp.join(dspdir, fname)
     if not osp.isfile(fpath):
-        smap = dsp.plot(**dot_view_opt)
-        folder = next(iter(smap))
         folder._name = folder.sitemap.foldername = fname
         dot = folder.dot(smap.rules(index=False))
-        dot.sitemap.render(directory=dspdir, index=False)
-        dot.save(fpath, '')
+        os.makedirs(dspdir, exist_ok=True)
+        # Parallel builds: render in a private folder, then move atomically.
+        tmp = tempfile.mkdtemp(dir=dspdir)
+        try:
+            dot.sitemap.render(
+                directory=tmp, index=False,
+                cache_dir=osp.join(dspdir, '.cache')
+            )
+            _atomic_move(tmp, dspdir)
+            dot.save(osp.join(tmp, 'dispatcher.gv'), '')
+            os.replace(osp.join(tmp, 'dispatcher.gv'), fpath)  # Marks done.
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
 
     dsource = osp.dirname(osp.join(env.srcdir, env.docname))
     path = osp.relpath(fpath, dsource).replace('\\', '/')
@@ -243,7 +277,14 @@ def render_dot_html(self, node, code, options, prefix='dispatcher',
     if dirpath:
         outd = osp.join(osp.dirname(outfn), osp.split(dirpath)[-1])
         if not osp.isdir(outd):
-            shutil.copytree(dirpath, outd)
+            tmp = tempfile.mkdtemp(dir=osp.dirname(outfn))
+            try:
+                shutil.copytree(dirpath, osp.join(tmp, 'd'))
+                os.rename(osp.join(tmp, 'd'), outd)
+            except OSError:  # Copied by a parallel writer.
+                pass
+            finally:
+                shutil.rmtree(tmp, ignore_errors=True)
 
     extend = []
     if fname is None:
@@ -397,3 +438,4 @@ def setup(app):
     add_autodocumenter(app, DispatcherDocumenter)
     app.add_directive('dispatcher', DispatcherDirective)
     app.add_config_value('dispatchers_out_dir', '_build/_dispatchers', 'html')
+    return {'parallel_read_safe': True, 'parallel_write_safe': True}
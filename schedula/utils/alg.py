@@ -14,8 +14,10 @@ __author__ = 'Vincenzo Arcidiacono'
 
 from .gen import counter
 from .cst import EMPTY, NONE
-from .dsp import SubDispatch, bypass, selector, map_dict, stlp, parent_func
+from .dsp import SubDispatch, bypass, selector, map_dict, stlp, parent_func, \
+    combine_dicts
 import collections
+import itertools
 
 
 # modified from NetworkX library
@@ -101,6 +103,205 @@ def get_unused_node_id(graph, initial_guess='unknown'):
     return node_id  # Returns an unused node id.
 
 
+def get_version(dsp):
+    """
+    Returns the version of the dispatcher nodes.
+
+    It is increased (see :func:`update_version`) when nodes are added to or
+    removed from the dispatcher, so that cached indices can be checked.
+
+    :param dsp:
+        A dispatcher.
+    :type dsp: schedula.Dispatcher
+
+    :return:
+        The version of the dispatcher nodes.
+    :rtype: int
+    """
+    return dsp.__dict__.get('_version', 0)
+
+
+def update_version(dsp):
+    """
+    Increases the version of the dispatcher nodes.
+
+    :param dsp:
+        A dispatcher.
+    :type dsp: schedula.Dispatcher
+    """
+    dsp._version = get_version(dsp) + 1
+
+
+def _set_bulk_node_ids(dsp, data_list=None, fun_list=None, dsp_list=None):
+    """
+    Assigns the node ids of data and function lists and validates their links.
+
+    The ids are the same that would be assigned by sequential calls of
+    `add_data` and `add_function`, but they are generated with a per-prefix
+    counter (i.e., O(1) per node instead of probing all `<%d>` suffixes).
+
+    :param dsp:
+        A dispatcher where the nodes will be added.
+    :type dsp: schedula.Dispatcher
+
+    :param data_list:
+        It is a list of data node kwargs to be loaded.
+    :type data_list: list[dict], optional
+
+    :param fun_list:
+        It is a list of function node kwargs to be loaded.
+    :type fun_list: list[dict], optional
+
+    :param dsp_list:
+        It is a list of sub-dispatcher node kwargs to be loaded.
+    :type dsp_list: list[dict], optional
+
+    :return:
+        Data, function, and sub-dispatcher lists with the assigned ids.
+    :rtype: (list[dict], list[dict], list[dict])
+    """
+
+    nodes, used, counters, fun_ids = dsp.nodes, set(), {}, set()
+
+    def _is_used(node_id):
+        return node_id in used or node_id in nodes
+
+    def _unused_node_id(initial_guess):
+        node_id = initial_guess
+        if _is_used(node_id):
+            n = counters.get(initial_guess, 0)
+            node_id = '%s<%d>' % (initial_guess, n)
+            while _is_used(node_id):  # Check if node id is used.
+                n += 1
+                node_id = '%s<%d>' % (initial_guess, n)
+            counters[initial_guess] = n + 1
+        used.add(node_id)
+        return node_id
+
+    def _check_data(node_bunch, msg):
+        for u in node_bunch:
+            if u in fun_ids or (u in nodes and nodes[u]['type'] != 'data'):
+                raise ValueError(msg.format(u))
+            used.add(u)
+
+    data_list, fun_list = list(data_list or ()), list(fun_list or ())
+
+    for i, kw in enumerate(data_list):
+        data_id = kw.get('data_id', None)
+        if data_id is None:
+            data_id = _unused_node_id('unknown')
+            data_list[i] = combine_dicts(kw, {'data_id': data_id})
+        else:
+            _check_data((data_id,), 'Invalid data id: override function {}')
+
+    for i, kw in enumerate(fun_list):
+        function_id = kw.get('function_id', None)
+        if function_id is None:
+            try:  # Set function name.
+                function_id = parent_func(kw.get('function', None)).__name__
+            except Exception as ex:
+                raise ValueError('Invalid function id due to:\n{}'.format(ex))
+        fun_list[i] = kw = combine_dicts(kw, {
+            'function_id': _unused_node_id(function_id)
+        })
+        fun_ids.add(kw['function_id'])
+
+        for k in ('inputs', 'outputs'):
+            msg = 'Invalid %s id: {} is not a data node' % k[:-1]
+            _check_data(kw.get(k, None) or (), msg)
+
+    for kw in dsp_list or ():
+        _check_data(kw['inputs'], 'Invalid input id: {} is not a data node')
+        msg = 'Invalid output id: {} is not a data node'
+        _check_data(_children(kw['outputs']), msg)
+
+    return data_list, fun_list, list(dsp_list or ())
+
+
+def _add_bulk_nodes(dsp, data_list=None, fun_list=None):
+    """
+    Adds data and function nodes (and their edges) to the dispatcher map with
+    one `add_nodes_from` and one `add_edges_from`.
+
+    The node ids and links must be already validated by
+    :func:`_set_bulk_node_ids`. The resulting map (node indices and insertion
+    order included) is the same of sequential `add_data` and `add_function`.
+
+    :param dsp:
+        A dispatcher where the nodes will be added.
+    :type dsp: schedula.Dispatcher
+
+    :param data_list:
+        It is a list of data node kwargs to be loaded.
+    :type data_list: list[dict], optional
+
+    :param fun_list:
+        It is a list of function node kwargs to be loaded.
+    :type fun_list: list[dict], optional
+
+    :return:
+        Data and function node ids.
+    :rtype: (list[str], list[str])
+    """
+    from .cst import START, SINK
+    nodes, edges, added = [], [], set()
+    dfl = dsp.default_values
+
+    def _add_data(**kw):
+        data_id, attr, (value, dist) = dsp._data_node(**kw)
+        nodes.append((data_id, attr))
+        added.add(data_id)
+        if value is EMPTY:
+            dfl.pop(data_id, None)
+        else:
+            dfl[data_id] = {'value': value, 'initial_dist': dist}
+        return data_id
+
+    def _has_node(node_id):
+        return node_id in added or node_id in dsp.nodes
+
+    def _add_edges(fun_id, nodes_bunch, weights, input):
+        for u in nodes_bunch:
+            if not _has_node(u):
+                _add_data(data_id=u)
+            e = (u, fun_id) if input else (fun_id, u)
+            w = {'weight': weights[u]} if weights and u in weights else {}
+            edges.append(e + (w,))
+
+    data_ids = [_add_data(**kw) for kw in data_list or ()]
+
+    fun_ids = []
+    for kw in fun_list or ():
+        kw = dict(kw)
+        inputs, outputs = kw.pop('inputs', None), kw.pop('outputs', None)
+        inp_weight = kw.pop('inp_weight', None)
+        out_weight = kw.pop('out_weight', None)
+
+        if inputs is None:  # Set a dummy input.
+            if not _has_node(START):
+                _add_data(data_id=START)
+            inputs = [START]
+
+        if outputs is None:  # Set a dummy output.
+            if not _has_node(SINK):
+                _add_data(data_id=SINK)
+            outputs = [SINK]
+
+        fun_id, attr = dsp._function_node(inputs=inputs, outputs=outputs, **kw)
+        nodes.append((fun_id, attr))
+        added.add(fun_id)
+        _add_edges(fun_id, inputs, inp_weight, True)
+        _add_edges(fun_id, outputs, out_weight, False)
+        fun_ids.append(fun_id)
+
+    dsp.dmap.add_nodes_from(nodes)
+    dsp.dmap.add_edges_from(edges)
+
+    update_version(dsp)  # Cached indices depend on the nodes.
+
+    return data_ids, fun_ids
+
+
 def add_func_edges(dsp, fun_id, nodes_bunch, edge_weights=None, input=True,
                    data_nodes=None):
     """
@@ -152,6 +353,7 @@ def add_func_edges(dsp, fun_id, nodes_bunch, edge_weights=None, input=True,
                 data_nodes.append(fun_id)  # Add function id to be removed.
 
                 remove_nodes(data_nodes)  # Remove function and new data nodes.
+                update_version(dsp)
 
                 raise ValueError(msg.format(u))  # Raise error.
         except KeyError:
@@ -295,7 +497,101 @@ def _children(inputs):
     return set(_iter_list_nodes(inputs.values()))
 
 
-def _get_node(nodes, node_id, fuzzy=True):
+class NodeIndex(object):
+    """
+    Index of the node ids of a dispatcher for fuzzy (substring) lookups.
+
+    The ids are sorted and, for string ids, their trigrams are indexed. A
+    query returns the first id (in sorted order) that contains it, as a linear
+    scan would do. The results are memoized.
+
+    :param nodes:
+        Dispatcher nodes.
+    :type nodes: dict
+
+    Example::
+
+        >>> index = NodeIndex({'speed': 0, 'max speed': 1, 'time': 2})
+        >>> index.search('speed')
+        'max speed'
+        >>> index.search('ime'), index.search('z')
+        ('time', None)
+    """
+
+    #: Maximum number of memoized results.
+    maxsize = 1024
+
+    def __init__(self, nodes):
+        self.keys = keys = sorted(nodes)
+        self.others, self.trigrams, self.results = [], {}, {}
+        for i, k in enumerate(keys):
+            if isinstance(k, str):
+                for t in {k[j:j + 3] for j in range(len(k) - 2)}:
+                    self.trigrams.setdefault(t, []).append(i)
+            else:
+                self.others.append(i)
+
+    def _candidates(self, node_id):
+        if not isinstance(node_id, str) or len(node_id) < 3:
+            return range(len(self.keys))
+        trigrams, c = self.trigrams, None
+        for t in sorted({node_id[j:j + 3] for j in range(len(node_id) - 2)},
+                        key=lambda t: len(trigrams.get(t, ()))):
+            c = set(trigrams.get(t, ())) if c is None else c
+            c.intersection_update(trigrams.get(t, ()))
+            if not c:
+                break
+        c.update(self.others)
+        return sorted(c)
+
+    def search(self, node_id):
+        """
+        Returns the first node id (in sorted order) that contains the query.
+
+        :param node_id:
+            Query.
+        :type node_id: str
+
+        :return:
+            The matched node id or None.
+        :rtype: str
+        """
+        try:
+            return self.results[node_id]
+        except KeyError:
+            keys, res = self.keys, None
+            for i in self._candidates(node_id):
+                if node_id in keys[i]:
+                    res = keys[i]
+                    break
+            if len(self.results) >= self.maxsize:
+                self.results.clear()
+            self.results[node_id] = res
+            return res
+
+
+def get_node_index(dsp):
+    """
+    Returns the cached :class:`NodeIndex` of a dispatcher.
+
+    It is rebuilt when the dispatcher version changes (see
+    :func:`get_version`).
+
+    :param dsp:
+        A dispatcher.
+    :type dsp: schedula.Dispatcher
+
+    :return:
+        The node index.
+    :rtype: NodeIndex
+    """
+    index, version = dsp.__dict__.get('_node_index'), get_version(dsp)
+    if index is None or index[0] != version:
+        index = dsp._node_index = (version, NodeIndex(dsp.nodes))
+    return index[1]
+
+
+def _get_node(nodes, node_id, fuzzy=True, dsp=None):
     """
     Returns a dispatcher node that match the given node id.
 
@@ -307,6 +603,16 @@ def _get_node(nodes, node_id, fuzzy=True):
         Node id.
     :type node_id: str
 
+    :param fuzzy:
+        If True, it returns the first node (in sorted order) whose id contains
+        the given node id, when there is no exact match.
+    :type fuzzy: bool, optional
+
+    :param dsp:
+        Dispatcher that owns the nodes. If given, its cached node index is
+        used for the fuzzy lookup.
+    :type dsp: schedula.Dispatcher, optional
+
     :return:
          The dispatcher node and its id.
     :rtype: (str, dict)
@@ -316,10 +622,10 @@ def _get_node(nodes, node_id, fuzzy=True):
         return node_id, nodes[node_id]  # Return dispatcher node and its id.
     except KeyError as ex:
         if fuzzy:
-            it = sorted(nodes.items())
-            n = next(((k, v) for k, v in it if node_id in k), EMPTY)
-            if n is not EMPTY:
-                return n
+            index = get_node_index(dsp) if dsp else NodeIndex(nodes)
+            k = index.search(node_id)
+            if k is not None:
+                return k, nodes[k]
         raise ex
 
 
@@ -503,7 +809,7 @@ def get_sub_node(dsp, path, node_attr='auto', solution=NONE, _level=0,
     node_id = path[_level]  # Node id at given level.
 
     try:
-        node_id, node = _get_node(dsp.nodes, node_id)  # Get dispatcher node.
+        node_id, node = _get_node(dsp.nodes, node_id, dsp=dsp)  # Get node.
         path[_level] = node_id
     except KeyError:
         if _level == len(path) - 1 and node_attr in ('auto', 'output') \
@@ -572,7 +878,7 @@ class DspPipe(collections.OrderedDict):
         return "<%s instance at %s>" % (self.__class__.__name__, id(self))
 
 
-def get_full_pipe(sol, base=()):
+def get_full_pipe(sol, base=(), pipe=None, start=0):
     """
     Returns the full pipe of a dispatch run.
 
@@ -584,14 +890,23 @@ def get_full_pipe(sol, base=()):
         Base node id.
     :type base: tuple[str]
 
+    :param pipe:
+        A pipe to update. If None, a new pipe is created.
+    :type pipe: DspPipe, optional
+
+    :param start:
+        Index of the first task of the solution pipe to add.
+    :type start: int, optional
+
     :return:
         Full pipe of a dispatch run.
     :rtype: DspPipe
     """
 
-    pipe = DspPipe()
+    if pipe is None:
+        pipe = DspPipe()
 
-    for p in sol._pipe:
+    for p in itertools.islice(sol._pipe, start, None):
         n, s = p[-1]
         d = s.dsp
         p = {'task': p}
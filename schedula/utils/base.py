@@ -24,7 +24,8 @@ class Base(object):
                 memo[i] = threading.Event()
         cls = self.__class__
         memo[id(self)] = result = cls.__new__(cls)
-        for k, v in self.__dict__.items():
+        state = getattr(self, '__getstate__', lambda: self.__dict__)()
+        for k, v in state.items():
             setattr(result, k, copy.deepcopy(v, memo))
         return result
 
@@ -33,7 +34,8 @@ class Base(object):
              format=NONE, engine=NONE, encoding=NONE, graph_attr=NONE,
              node_attr=NONE, edge_attr=NONE, body=NONE, node_styles=NONE,
              node_data=NONE, node_function=NONE, edge_data=NONE, max_lines=NONE,
-             max_width=NONE, directory=None, sites=None):
+             max_width=NONE, max_nodes=NONE, ext=NONE, directory=None,
+             sites=None, cache_dir=None, lazy=False, workers=None):
         """
         Plots the Dispatcher with a graph in the DOT language with Graphviz.
 
@@ -90,10 +92,37 @@ class Base(object):
             Comment added to the first line of the source.
         :type comment: str
 
+        :param max_nodes:
+            Maximum number of nodes per page. Larger graphs are summarized
+            collapsing chains, fan-outs, and dense regions into aggregate
+            nodes, that link to the pages of the collapsed nodes.
+        :type max_nodes: int, optional
+
+        :param ext:
+            File extension of the dispatcher pages. If 'json', the pages are
+            exported as layout-free JSON models, to be explored with the
+            static `viewer.html` (laid out in the browser) without Graphviz.
+        :type ext: str, optional
+
         :param directory:
             (Sub)directory for source saving and rendering.
         :type directory: str, optional
 
+        :param cache_dir:
+            Directory of the persistent render cache. Graphviz is invoked only
+            for the graphs whose DOT source is not cached.
+        :type cache_dir: str, optional
+
+        :param lazy:
+            If True, the sub-dispatchers are expanded on demand, when their
+            pages are requested through the site server. When viewed without
+            `sites`, the site server lives as long as the returned sitemap.
+        :type lazy: bool, optional
+
+        :param workers:
+            Number of threads used to render the graphs when viewed.
+        :type workers: int, optional
+
         :param filename:
             File name for saving the source.
         :type filename: str, optional
@@ -159,6 +188,8 @@ class Base(object):
             'edge_data': edge_data,
             'max_lines': max_lines,  # 5
             'max_width': max_width,  # 200
+            'max_nodes': max_nodes,
+            'ext': ext,
         }
         options = {k: v for k, v in options.items() if v is not NONE}
         from .drw import SiteMap
@@ -170,13 +201,25 @@ class Base(object):
             workflow = workflow or False
 
         sitemap = SiteMap()
-        sitemap.add_items(self, workflow=workflow, depth=depth, **options)
+        sitemap.add_items(
+            self, workflow=workflow, depth=depth, lazy=lazy, **options
+        )
         if view:
             directory = directory or tempfile.mkdtemp()
-            if sites is None:
-                sitemap.render(directory=directory, view=True)
+            if sites is None and not lazy:
+                sitemap.render(
+                    directory=directory, view=True, cache_dir=cache_dir,
+                    workers=workers
+                )
             else:
-                sites.add(sitemap.site(root_path=directory, view=True))
+                site = sitemap.site(
+                    root_path=directory, view=True, cache_dir=cache_dir,
+                    lazy=lazy
+                )
+                if sites is None:  # Only the requested pages are rendered.
+                    sitemap._site = site
+                else:
+                    sites.add(site)
         return sitemap
 
     def get_node(self, *node_ids, node_attr=NONE):
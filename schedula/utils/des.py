@@ -14,12 +14,24 @@ __author__ = 'Vincenzo Arcidiacono'
 
 import re
 import logging
+import threading
 from .dsp import SubDispatch, SubDispatchFunction, bypass, replicate_value, \
     parent_func
 
 
 log = logging.getLogger(__name__)
 
+#: Dispatchers consulted by the description searches in progress.
+_local = threading.local()
+
+
+def _get_index(dsp):
+    from .alg import get_version
+    index, version = dsp.__dict__.get('_des_index'), get_version(dsp)
+    if index is None or index[0] != version:
+        index = dsp._des_index = (version, {})
+    return index[1]
+
 
 def get_attr_doc(doc, attr_name, get_param=True, what='description'):
     if what == 'value_type':
@@ -154,10 +166,9 @@ def _search_doc_in_func(dsp, node_id, where_succ=True, node_type='function',
 
     for k, v in ((k, nodes[k]) for k in sorted(neighbors[node_id])):
         if v['type'] == node_type and check(k):
-            # noinspection PyBroadException
             try:
                 des, link = get_des(v)
-            except:
+            except Exception:
                 pass
 
         if des:
@@ -171,7 +182,58 @@ def _search_doc_in_func(dsp, node_id, where_succ=True, node_type='function',
 
 
 def search_node_description(node_id, node_attr, dsp, what='description'):
-
+    """
+    Returns the node description and link.
+
+    The results are cached in a per-dispatcher index. An entry is invalidated
+    when the relevant node attributes change or when nodes are added to or
+    removed from one of the dispatchers consulted to compute it.
+
+    :param node_id:
+        Node id.
+    :type node_id: str
+
+    :param node_attr:
+        Node attributes.
+    :type node_attr: dict
+
+    :param dsp:
+        Dispatcher that contains the node.
+    :type dsp: schedula.Dispatcher
+
+    :param what:
+        What to search (i.e., 'description' or 'value_type').
+    :type what: str, optional
+
+    :return:
+        Node description and link.
+    :rtype: (str, str)
+    """
+    from .alg import get_version
+    index, key = _get_index(dsp), (node_id, what)
+    attr = tuple(node_attr.get(k) for k in ('type', what, 'function'))
+    stack = _local.__dict__.setdefault('stack', [])
+    try:
+        cached, deps, res = index[key]
+        if all(i is j for i, j in zip(cached, attr)) and \
+                all(get_version(d) == v for d, v in deps.values()):
+            if stack:  # Descriptions may be inherited from sub-dispatchers.
+                stack[-1].update(deps)
+            return res
+    except KeyError:
+        pass
+    stack.append({id(dsp): (dsp, get_version(dsp))})
+    try:
+        res = _search_node_description(node_id, node_attr, dsp, what)
+    finally:
+        deps = stack.pop()
+    if stack:
+        stack[-1].update(deps)
+    index[key] = attr, deps, res
+    return res
+
+
+def _search_node_description(node_id, node_attr, dsp, what='description'):
     if node_attr['type'] in ('function', 'dispatcher'):
         func = parent_func(node_attr.get('function', None))
     else:
@@ -153,15 +153,18 @@ def update_filenames(node, filenames):
         filenames.append(filename)
 
 
-def site_view(app, node, context, generated_files, rendered):
-    static_folder, filepath = app.static_folder, context[(node, None)]
+def site_view(app, node, context, generated_files, rendered, cache_dir=None,
+              extra=None):
+    static_folder, filepath = app.static_folder, context[(node, extra)]
     if not osp.isfile(osp.join(static_folder, filepath)):
-        files = cached_view(node, static_folder, context, rendered).values()
+        files = cached_view(
+            node, static_folder, context, rendered, cache_dir
+        ).values()
         generated_files.extend(files)
     return app.send_static_file(filepath.replace('\\', '/'))
 
 
-def render_output(out, pformat):
+def render_output(out, pformat, max_items=None):
     out = parent_func(out)
     if inspect.isfunction(out):
         # noinspection PyBroadException
@@ -176,13 +179,121 @@ def render_output(out, pformat):
     if isinstance(out, str):
         return out
 
+    if max_items is not None:
+        out = summarize_output(out, max_items)
+
     return pformat(out)
 
 
+def _link_id(funcs):
+    # Id of the first link of the '*' function, if any.
+    for k, f in funcs:
+        if k == '*':
+            return next(f(), (None,))[0]
+
+
+class _More(object):
+    # Placeholder of the omitted items, it is sorted as the last one.
+    def __init__(self, n=None):
+        self.n = n
+
+    def __repr__(self):
+        return '...' if self.n is None else '...(%d more)' % self.n
+
+    def __lt__(self, other):
+        return False
+
+    def __gt__(self, other):
+        return True
+
+
+def summarize_output(out, max_items=1000):
+    """
+    Returns a bounded version of a value, to be rendered without formatting
+    its full representation.
+
+    Lists, tuples, sets, and dicts are truncated after `max_items` items (in
+    total), while larger numpy/pandas objects are summarized with their type,
+    shape, and dtype.
+
+    :param out:
+        Value to be rendered.
+    :type out: object
+
+    :param max_items:
+        Maximum number of items to keep.
+    :type max_items: int, optional
+
+    :return:
+        Bounded value.
+    :rtype: object
+
+    Example::
+
+        >>> summarize_output(list(range(10)), max_items=3)
+        [0, 1, 2, ...(7 more)]
+        >>> import numpy as np
+        >>> summarize_output({'a': np.zeros((10, 2))}, max_items=3)
+        {'a': <ndarray shape=(10, 2) dtype=float64>}
+    """
+    return _summarize(out, [max_items])
+
+
+class _Summary(str):
+    def __repr__(self):
+        return self
+
+
+def _summarize(out, budget):
+    from collections.abc import Mapping, Sequence, Set
+    is_dict = isinstance(out, Mapping)
+    if is_dict or isinstance(out, (Sequence, Set)) and \
+            not isinstance(out, (str, bytes, bytearray)):
+        items = []
+        for v in (out.items() if is_dict else out):
+            if budget[0] <= 0:
+                break
+            budget[0] -= 1
+            if is_dict:
+                v = v[0], _summarize(v[1], budget)
+            else:
+                v = _summarize(v, budget)
+            items.append(v)
+        n = len(out) - len(items)
+        if n:
+            items.append((_More(n), _More()) if is_dict else _More(n))
+        t, builtins = type(out), (list, tuple, set, frozenset, dict)
+        if t not in builtins and t is not collections.OrderedDict:
+            # E.g., defaultdict, namedtuple, range, or Solution.
+            if is_dict:
+                t = dict
+            elif isinstance(out, Set):
+                t = set
+            else:
+                t = tuple if isinstance(out, tuple) else list
+        return t(items)
+
+    shape = getattr(out, 'shape', None)
+    if isinstance(shape, tuple) and not isinstance(out, type):
+        size = functools.reduce(lambda x, y: x * y, shape, 1)
+        if size <= budget[0]:
+            budget[0] -= size
+        else:
+            budget[0] -= 1
+            dtype = getattr(out, 'dtype', None)
+            if dtype is None and hasattr(out, 'dtypes'):  # DataFrame.
+                dtype = ', '.join(sorted({str(d) for d in out.dtypes}))
+            return _Summary('<%s shape=%s dtype=%s>' % (
+                type(out).__name__, shape, dtype
+            ))
+    return out
+
+
 class SiteNode(object):
     counter = counter()
     ext = 'txt'
     pprint = pprint.PrettyPrinter(compact=True, width=200)
+    max_items = 100000
 
     def __init__(self, folder, node_id, item):
         self.folder = folder
@@ -214,7 +325,7 @@ class SiteNode(object):
         return self.title
 
     def render(self, *args, **kwargs):
-        return render_output(self.item, self.pprint.pformat)
+        return render_output(self.item, self.pprint.pformat, self.max_items)
 
     def view(self, filepath, *args, **kwargs):
         filepath = uncpath(filepath)
@@ -248,6 +359,7 @@ class FolderNode(object):
                                     'fillcolor': 'greenyellow'},
                 'dispatcher': {'shape': 'note', 'style': 'filled',
                                'fillcolor': 'springgreen'},
+                'aggregate': {'shape': 'box3d', 'fillcolor': 'lightgray'},
                 'edge': {None: None}
             }
         },
@@ -269,6 +381,7 @@ class FolderNode(object):
                 'subdispatchfunction': {'fillcolor': 'red'},
                 'subdispatchpipe': {'fillcolor': 'red'},
                 'dispatcher': {'fillcolor': 'red'},
+                'aggregate': {'fillcolor': 'red'},
             }
         }
     })
@@ -286,6 +399,8 @@ class FolderNode(object):
 
     edge_data = ('?', 'inp_id', 'out_id', 'weight')
 
+    node_aggregate = ('-', '.tooltip', 'nodes', '!error', '*region')
+
     node_map = {
         '-': (), # Add title.
         '?': (), # Optional title.
@@ -326,9 +441,17 @@ class FolderNode(object):
         except KeyError:
             pass
 
+    def render_value(self, out):
+        # Items beyond the budget cannot fit the display limits.
+        max_items = self.max_lines * self.max_width // 2 + 1
+        return render_output(out, self.pprint.pformat, max_items)
+
     def render_size(self, out):
-        lines = render_output(out, self.pprint.pformat).splitlines(True)
         n, w = self.max_lines, self.max_width
+        lines = self.render_value(out)
+        if len(lines) > n * (w + 1):
+            return False
+        lines = lines.splitlines(True)
         return len(lines) <= n and not any(len(l) > w for l in lines)
 
     def items(self):
@@ -441,8 +564,8 @@ class FolderNode(object):
                     ntype = (type(func).__name__.lower(),) + ntype
                 except (KeyError, AttributeError):
                     pass
-            elif self.type == 'edge':
-                ntype = 'edge',
+            elif self.type in ('edge', 'aggregate'):
+                ntype = self.type,
             else:
                 ntype = 'data',
             for style in ntype:
@@ -458,6 +581,8 @@ class FolderNode(object):
             funcs = self.node_function
         elif self.type == 'edge':
             funcs = self.edge_data
+        elif self.type == 'aggregate':
+            funcs = self.node_aggregate
         else:
             funcs = self.node_data
         r, s, match = {}, '_%s', self.re_node.match
@@ -513,7 +638,7 @@ class FolderNode(object):
         key, val = dict(ALIGN="RIGHT", BORDER=1), dict(ALIGN="LEFT", BORDER=1)
         rows, funcs, cnt = [], list(self.render_funcs()), {'attr': val}
         cnt['parent_ref'] = functools.partial(self.parent_ref, context)
-        href, pformat, links = self.href, self.pprint.pformat, self._links
+        href, links = self.href, self._links
         for k, func in funcs:
             if k == '.':
                 dot.update(func())
@@ -524,7 +649,7 @@ class FolderNode(object):
                         v = combine_dicts(val, {'text': j}, href(context, i))
                         tr.add(**v)
                     else:
-                        j = render_output(j, pformat)
+                        j = self.render_value(j)
                         s = jinja2_format(j, cnt)
                         if s.startswith('_Td('):
                             tr += eval(s)
@@ -534,7 +659,7 @@ class FolderNode(object):
                     rows.append(tr)
 
         if any(k[0] == '-' or (rows and k[0] == '?') for k in funcs):
-            link_id = next((next(f())[0] for k, f in funcs if k == '*'), None)
+            link_id = _link_id(funcs)
             kw = combine_dicts(
                 self.href(context, link_id),
                 {'COLSPAN': 2, 'BORDER': 0, 'text': self.title}
@@ -547,6 +672,159 @@ class FolderNode(object):
 
         return {k: str(v) for k, v in dot.items()}
 
+    def json(self, context=None):
+        if context is None:
+            context = {}
+        style = {k: str(v) for k, v in self.style().items()}
+        res = {'id': self.id, 'type': self.type, 'title': str(self.title)}
+        if 'label' in style:
+            res['label'] = style.pop('label')
+            res['style'] = style
+            return res
+        res['style'], rows, links = style, [], self._links
+        cnt = {'parent_ref': lambda text, attr=None: text}
+        funcs = list(self.render_funcs())
+        for k, func in funcs:
+            if k == '.':
+                res.update((i, str(j)) for i, j in func())
+            elif not (k == '*' or k == '-' or k == '?'):
+                for i, j in func():
+                    if i in links and (k == '!' or k == '+'):
+                        row = {'text': str(j)}
+                        row.update(self.href(context, i))
+                        row['text'] = str(row['text'])
+                    else:
+                        j = self.render_value(j)
+                        if '{{' in j:
+                            j = jinja2_format(j, cnt)
+                        row = {'text': j}
+                    row['key'] = str(i)
+                    rows.append(row)
+
+        link_id = _link_id(funcs)
+        href = self.href(context, link_id).get('href')
+        if href:
+            res['href'] = href
+        if rows:
+            res['rows'] = rows
+        return res
+
+
+class AggregateNode(FolderNode):
+    """
+    A node that collapses a group of nodes of a :class:`SiteFolder`.
+    """
+
+    def __init__(self, folder, group, attr, **options):
+        node_id = '%s (+%d)' % (group[0], len(group) - 1)
+        super(AggregateNode, self).__init__(folder, node_id, attr, **options)
+        self.group = group
+
+    def _tooltip(self):
+        nodes = ', '.join(map(str, self.group[:10]))
+        yield 'tooltip', nodes + (', ...' if len(self.group) > 10 else '')
+
+    def _nodes(self):
+        yield 'nodes', len(self.group)
+
+    def _region(self):
+        folder = self.folder
+        graph = folder.graph.subgraph(self.group)
+        yield 'region', SiteRegion(folder.item, folder.dsp, graph)
+
+
+class SiteRegion(object):
+    """
+    A sub-graph of a dispatcher or solution to be plotted as a folder.
+
+    It proxies the item, except for its inputs and outputs.
+    """
+
+    def __init__(self, item, dsp, graph):
+        self.item, self.dsp, self.graph = item, dsp, graph
+
+    def __getattr__(self, item):
+        if item in ('inputs', 'outputs', 'item'):
+            raise AttributeError(item)
+        return getattr(self.item, item)
+
+    def __getitem__(self, item):
+        return self.item[item]
+
+
+def lod_groups(graph, node_ids, max_nodes):
+    """
+    Groups the nodes of a graph into at most `max_nodes` groups (plus the
+    special nodes, that are never grouped).
+
+    Chains and nodes with the same predecessors and successors (e.g.,
+    fan-outs) are grouped first. If the budget is still exceeded, the groups
+    are merged in blocks following a depth-first order of the graph.
+
+    :param graph:
+        A directed graph.
+    :type graph: networkx.DiGraph
+
+    :param node_ids:
+        Node ids to be grouped.
+    :type node_ids: list
+
+    :param max_nodes:
+        Maximum number of nodes.
+    :type max_nodes: int
+
+    :return:
+        Groups of node ids.
+    :rtype: list[list]
+
+    Example::
+
+        >>> from networkx import DiGraph
+        >>> graph = DiGraph([(1, 2), (2, 3), (3, 4), (3, 5), (3, 6)])
+        >>> lod_groups(graph, [1, 2, 3, 4, 5, 6], 3)
+        [[1, 2, 3], [4, 5, 6]]
+    """
+    from networkx import dfs_preorder_nodes
+    special = {START, END, SINK, SELF, PLOT, EMPTY}
+    ids = [k for k in node_ids if k not in special]
+    max_nodes = max(max_nodes - (len(node_ids) - len(ids)), 2)
+    if len(ids) <= max_nodes:
+        return [[k] for k in ids]
+
+    parent = {k: k for k in ids}
+
+    def find(k):
+        while parent[k] != k:
+            parent[k] = k = parent[parent[k]]
+        return k
+
+    pred, succ, sig = graph.pred, graph.succ, {}
+    for k in ids:
+        if len(succ[k]) == 1:  # Chains.
+            v = next(iter(succ[k]))
+            if v in parent and len(pred[v]) == 1 and v != k:
+                parent[find(k)] = find(v)
+        key = frozenset(pred[k]), frozenset(succ[k])
+        if key in sig:  # Same predecessors and successors.
+            parent[find(k)] = find(sig[key])
+        else:
+            sig[key] = k
+
+    groups = collections.OrderedDict()
+    for k in ids:
+        groups.setdefault(find(k), []).append(k)
+    groups = list(groups.values())
+    if len(groups) == 1:  # Everything has been collapsed.
+        groups = [[k] for k in ids]
+
+    if len(groups) > max_nodes:
+        order = {k: i for i, k in enumerate(dfs_preorder_nodes(graph))}
+        groups.sort(key=lambda g: min(order[k] for k in g))
+        n = -(-len(groups) // max_nodes)
+        groups = [sum(groups[i:i + n], []) for i in range(0, len(groups), n)]
+
+    return groups
+
 
 class SiteFolder(object):
     counter = SiteNode.counter
@@ -558,18 +836,24 @@ class SiteFolder(object):
         'format': 'svg'
     }
     folder_node = FolderNode
+    aggregate_node = AggregateNode
     ext = 'svg'
 
     def __init__(self, item, dsp, graph, name='', workflow=False,
-                 digraph=None, **options):
+                 digraph=None, max_nodes=None, ext=None, **options):
         self.item, self.dsp, self.graph = item, dsp, graph
+        self.ext = ext or self.ext
         self._name = name
         self.workflow = workflow
         self.id = str(self.counter())
         self.options = options
+        self.max_nodes = max_nodes
         nodes = collections.OrderedDict(self._nodes)
         self.nodes = list(nodes.values())
-        self.edges = [e for k, e in self._edges(nodes)]
+        edges = collections.OrderedDict(self._edges(nodes))
+        self.edges = list(edges.values())
+        if max_nodes and len(nodes) > max_nodes:
+            self._collapse(nodes, edges)
         self.sitemap = None
         self.extra_files = []
         if digraph is not None:
@@ -672,6 +956,36 @@ class SiteFolder(object):
             a = combine_dicts(a, base=base)
             yield (u, v), self.folder_node(self, '{} --> {}'.format(u, v), a)
 
+    def _collapse(self, nodes, edges):
+        index = {}
+        for group in lod_groups(self.graph, list(nodes), self.max_nodes):
+            if len(group) > 1:
+                attr = {'type': 'aggregate'}
+                errors = sum('error' in nodes[k].attr for k in group)
+                if errors:
+                    attr['error'] = '%d nodes failed' % errors
+                node = self.aggregate_node(self, group, attr, **self.options)
+                index.update(dict.fromkeys(group, node))
+
+        self.nodes = list(collections.OrderedDict(
+            (id(n), n) for n in (index.get(k, v) for k, v in nodes.items())
+        ).values())
+
+        self.edges, aggregated = [], {}
+        for (u, v), edge in edges.items():
+            u, v = index.get(u, nodes[u]), index.get(v, nodes[v])
+            if u is v:
+                continue
+            if u.type != 'aggregate' and v.type != 'aggregate':
+                self.edges.append(edge)
+            elif (u, v) not in aggregated:
+                attr = {'type': 'edge', 'dot_ids': (u.id, v.id)}
+                edge = self.folder_node(
+                    self, '{} --> {}'.format(u.node_id, v.node_id), attr
+                )
+                aggregated[(u, v)] = edge
+                self.edges.append(edge)
+
     def dot(self, context=None):
         context = context or {}
         kw = combine_nested_dicts(self.digraph, {
@@ -680,19 +994,60 @@ class SiteFolder(object):
         })
         kw['body'] = ['%s = %s' % (k, v) for k, v in sorted(kw['body'].items())]
         dot = DspPlot(self.sitemap, **kw)
-        id_map = {}
+        # Node ids by position, so the DOT source is the same for every plot.
+        ids = {node.id: str(i) for i, node in enumerate(self.nodes)}
         for node in self.nodes:
-            id_map[node.node_id] = node.id
-            dot.node(node.id, **node.dot(context))
+            dot.node(ids[node.id], **node.dot(context))
 
         for edge in self.edges:
-            dot.edge(*edge.attr['dot_ids'], **edge.dot(context))
+            u, v = edge.attr['dot_ids']
+            dot.edge(ids[u], ids[v], **edge.dot(context))
         return dot
 
-    def view(self, filepath, context=None):
+    def json(self, context=None):
+        """
+        Returns the layout-free model of the folder (i.e., nodes and edges with
+        their styles, tooltips, links, and values).
+
+        :param context:
+            Site context (i.e., file paths of the site nodes).
+        :type context: dict, optional
+
+        :return:
+            JSON serializable model.
+        :rtype: dict
+        """
+        edges = []
+        for edge in self.edges:
+            e = edge.json(context)
+            e['source'], e['target'] = edge.attr['dot_ids']
+            edges.append(e)
+        return {
+            'name': str(self.name), 'label': self.label_name, 'edges': edges,
+            'nodes': [node.json(context) for node in self.nodes]
+        }
+
+    def dumps(self, context=None):
+        import json
+        return json.dumps(self.json(context), separators=(',', ':'))
+
+    def view(self, filepath, context=None, cache_dir=None):
         fpath, f = osp.splitext(filepath)
+        if f == '.json':  # Layout-free export.
+            filepath = uncpath(filepath)
+            os.makedirs(osp.dirname(filepath), exist_ok=True)
+            with open(filepath, 'w', encoding='utf-8') as file:
+                file.write(self.dumps(context))
+            return {(id(self.item), None): filepath}
         dot = self.dot(context=context)
         dot.format = f[1:]
+        if cache_dir:
+            filepath = uncpath(filepath)
+            os.makedirs(osp.dirname(filepath), exist_ok=True)
+            fpath = tempfile.mktemp(dir=osp.dirname(filepath))
+            shutil.copyfile(cached_render(dot, cache_dir), fpath)
+            os.replace(fpath, filepath)
+            return {(id(self.item), None): filepath}
         fpath = dot.render(
             filename=tempfile.mktemp(dir=osp.dirname(filepath)), directory=None,
             cleanup=True
@@ -704,6 +1059,57 @@ class SiteFolder(object):
         return {(id(self.item), None): filepath}
 
 
+def dot_cache_key(dot):
+    """
+    Returns the cache key of a graphviz graph, i.e. its engine, format, and
+    DOT source.
+
+    The DOT sources of :meth:`SiteFolder.dot` number the nodes by position,
+    so the key is stable across plots and processes.
+
+    :param dot:
+        Graphviz graph.
+    :type dot: graphviz.Digraph
+
+    :return:
+        Cache key.
+    :rtype: bytes
+    """
+    return '\n'.join((dot.engine, dot.format, dot.source)).encode('utf-8')
+
+
+def cached_render(dot, cache_dir):
+    """
+    Renders a graphviz graph through a persistent cache keyed by the hash of
+    its DOT source, engine, and format (see :func:`dot_cache_key`).
+
+    :param dot:
+        Graphviz graph.
+    :type dot: graphviz.Digraph
+
+    :param cache_dir:
+        Cache directory.
+    :type cache_dir: str
+
+    :return:
+        File path of the cached render.
+    :rtype: str
+    """
+    import hashlib
+    cache_dir = uncpath(cache_dir)
+    fpath = osp.join(cache_dir, '%s.%s' % (
+        hashlib.sha1(dot_cache_key(dot)).hexdigest(), dot.format
+    ))
+    if not osp.isfile(fpath):
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp = dot.render(
+            filename=tempfile.mktemp(dir=cache_dir), directory=None,
+            cleanup=True
+        )
+        os.replace(tmp, fpath)  # Atomic, the cache can be shared.
+    return fpath
+
+
 class SiteIndex(SiteNode):
     ext='html'
 
@@ -823,6 +1229,7 @@ class SiteMap(collections.OrderedDict):
         super(SiteMap, self).__init__()
         self._nodes = []
         self.foldername = ''
+        self.pending = None  # Callback that expands a lazy folder.
         self.index = self.site_index(self)
 
     def __setitem__(self, key, value, *args, **kwargs):
@@ -871,7 +1278,9 @@ class SiteMap(collections.OrderedDict):
 
     def add_item(self, item, workflow=False, **options):
         item = parent_func(item)
-        if workflow:
+        if isinstance(item, SiteRegion):
+            dsp, graph = item.dsp, item.graph
+        elif workflow:
             item = self.get_sol_from(item)
             dsp, graph = item.dsp, item.workflow
         else:
@@ -882,12 +1291,25 @@ class SiteMap(collections.OrderedDict):
         folder.sitemap = smap = self[folder] = self.__class__()
         return smap, folder
 
-    def add_items(self, item, workflow=False, depth=-1, **options):
+    def add_items(self, item, workflow=False, depth=-1, lazy=False,
+                  **options):
         smap, folder = self.add_item(item, workflow=workflow, **options)
         if depth > 0:
             depth -= 1
-        site_node, append = self.site_node, smap._nodes.append
-        add_items = functools.partial(smap.add_items, workflow=workflow)
+        smap.pending = functools.partial(
+            smap._expand_folder, folder, workflow, depth, lazy
+        )
+        if not lazy:
+            smap.pending()
+        return folder
+
+    def _expand_folder(self, folder, workflow, depth, lazy):
+        self.pending = None
+        site_node, append = self.site_node, self._nodes.append
+        kw = {'max_nodes': folder.max_nodes, 'ext': folder.ext}
+        add_items = functools.partial(
+            self.add_items, workflow=workflow, lazy=lazy, **kw
+        )
         for node in itertools.chain(folder.nodes, folder.edges):
             links, node_id = node._links, node.node_id
             only_site_node = depth == 0 or node.type == 'data'
@@ -901,7 +1323,20 @@ class SiteMap(collections.OrderedDict):
                     append(link)
                 links[k] = link
 
-        return folder
+    def expand(self, depth=-1):
+        """
+        Expands the folders that have been added lazily.
+
+        :param depth:
+            Depth of sub-dispatch to expand. If negative all levels are
+            expanded.
+        :type depth: int, optional
+        """
+        if self.pending:
+            self.pending()
+        if depth != 0:
+            for smap in self.values():
+                smap.expand(depth=depth - 1)
 
     @staticmethod
     def get_dsp_from(item):
@@ -923,10 +1358,16 @@ class SiteMap(collections.OrderedDict):
             return item
         raise ValueError('Type %s not supported.' % type(item).__name__)
 
-    def app(self, root_path=None, depth=-1, index=True, **kwargs):
+    def app(self, root_path=None, depth=-1, index=True, cache_dir=None,
+            lazy=False, maxsize=128, **kwargs):
         root_path = osp.abspath(root_path or tempfile.mktemp())
         import flask
         app = flask.Flask(root_path, root_path=root_path, **kwargs)
+        if lazy:
+            return LazySiteView(
+                self, app, depth, index, cache_dir, maxsize
+            ).add_url_rules()
+        self.expand(depth=depth)
         generated_files, rendered = [], {}
         func = functools.partial(cleanup, generated_files, rendered)
         rule = '/cleanup'
@@ -936,7 +1377,8 @@ class SiteMap(collections.OrderedDict):
         context = self.rules(depth=depth, index=index)
         for (node, extra), filepath in context.items():
             func = functools.partial(
-                site_view, app, node, context, generated_files, rendered
+                site_view, app, node, context, generated_files, rendered,
+                cache_dir, extra
             )
             app.add_url_rule('/%s' % filepath, filepath, func)
 
@@ -945,8 +1387,10 @@ class SiteMap(collections.OrderedDict):
 
         return app
 
-    def site(self, root_path=None, depth=-1, index=True, view=False, **kw):
-        site = Site(self, root_path=root_path, depth=depth, index=index, **kw)
+    def site(self, root_path=None, depth=-1, index=True, view=False,
+             cache_dir=None, lazy=False, **kw):
+        site = Site(self, root_path=root_path, depth=depth, index=index,
+                    cache_dir=cache_dir, lazy=lazy, **kw)
 
         if view:
             site.run()
@@ -954,11 +1398,22 @@ class SiteMap(collections.OrderedDict):
 
         return site
 
-    def render(self, depth=-1, directory='static', view=False, index=True):
-        context, rendered = self.rules(depth=depth, index=index), {}
+    def render(self, depth=-1, directory='static', view=False, index=True,
+               workers=None, cache_dir=None):
+        self.expand(depth=depth)
+        context = self.rules(depth=depth, index=index)
+        groups = collections.OrderedDict()  # Nodes that share the same item.
         for node, extra in context:
             if not extra:
-                cached_view(node, directory, context, rendered)
+                groups.setdefault(id(node.item), []).append(node)
+
+        func = functools.partial(_render_group, directory, context, cache_dir)
+        if workers and workers > 1:
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(workers) as executor:
+                list(executor.map(func, groups.values()))
+        else:
+            list(map(func, groups.values()))
 
         fpath = osp.join(directory, next(iter(context.values()), ''))
         if view:
@@ -966,7 +1421,121 @@ class SiteMap(collections.OrderedDict):
         return fpath
 
 
-def cached_view(node, directory, context, rendered):
+class LazySiteView(object):
+    """
+    Serves the pages of a lazy :class:`SiteMap` from a catch-all route.
+
+    The folders are expanded only when a page beneath them is requested, and
+    the rendered folder pages are kept in an in-memory LRU. The rules and the
+    pending folders are indexed by file path, and re-indexed only when a
+    folder is expanded.
+    """
+
+    def __init__(self, sitemap, app, depth=-1, index=True, cache_dir=None,
+                 maxsize=128):
+        import threading
+        self.sitemap, self.app, self.cache_dir = sitemap, app, cache_dir
+        self.depth, self.index, self.maxsize = depth, index, maxsize
+        self.pages = collections.OrderedDict()
+        self.generated_files, self.rendered = [], {}
+        self.lock = threading.RLock()
+        self._set_context(sitemap.rules(depth=depth, index=index))
+
+    def _set_context(self, context):
+        # Index the rules and the pending folders by file path.
+        self.context, self.files, self.folders = context, {}, {}
+        for k, f in context.items():
+            self.files[f] = k
+            node, extra = k
+            smap = getattr(node, 'sitemap', None)
+            if extra is None and isinstance(node, SiteFolder) and \
+                    smap.pending:
+                d = '/'.join(filter(None, (osp.dirname(f), smap.foldername)))
+                self.folders.setdefault(f, []).append(smap)
+                self.folders.setdefault(d + '/', []).append(smap)
+
+    def add_url_rules(self):
+        app = self.app
+        app.add_url_rule('/cleanup', 'cleanup', self.cleanup, methods=['POST'])
+        rule = '/shutdown'
+        app.add_url_rule(rule, rule[1:], shutdown_server, methods=['POST'])
+        app.add_url_rule('/<path:filepath>', 'lazy_view', self)
+        if self.context:
+            func = functools.partial(self, next(iter(self.context.values())))
+            app.add_url_rule('/', 'lazy_root', func)
+        return app
+
+    def expand(self, filepath):
+        """
+        Expands the pending folders until the file path has a rule.
+
+        :return:
+            The context key of the file path or None if it does not exist.
+        :rtype: tuple
+        """
+        parts = filepath.split('/')
+        paths = ['/'.join(parts[:i]) + '/' for i in range(1, len(parts))]
+        paths.append(filepath)
+        with self.lock:
+            while True:
+                smaps = [m for p in paths for m in self.folders.get(p, ())]
+                if not smaps:
+                    return self.files.get(filepath)
+                for smap in smaps:
+                    if smap.pending:
+                        smap.pending()
+                self._set_context(self.sitemap.rules(self.depth, self.index))
+
+    def cleanup(self):
+        with self.lock:
+            self.pages.clear()
+        return cleanup(self.generated_files, self.rendered)
+
+    def page(self, node, filepath):
+        with self.lock:
+            data = self.pages.pop(filepath, None)
+        if data is None and filepath.endswith('.json'):
+            data = node.dumps(self.context).encode('utf-8')
+        elif data is None:
+            dot = node.dot(context=self.context)
+            dot.format = osp.splitext(filepath)[1][1:]
+            if self.cache_dir:
+                with open(cached_render(dot, self.cache_dir), 'rb') as f:
+                    data = f.read()
+            else:
+                data = dot.pipe()
+        with self.lock:
+            self.pages[filepath] = data
+            while len(self.pages) > self.maxsize:
+                self.pages.popitem(last=False)
+        return data
+
+    def __call__(self, filepath):
+        import flask
+        import mimetypes
+        key = self.expand(filepath)
+        if key is None:
+            flask.abort(404)
+        node, extra = key
+        if extra is None and isinstance(node, SiteFolder):
+            return flask.Response(
+                self.page(node, filepath),
+                mimetype=mimetypes.guess_type(filepath)[0]
+            )
+        return site_view(
+            self.app, node, self.context, self.generated_files, self.rendered,
+            self.cache_dir, extra
+        )
+
+
+def _render_group(directory, context, cache_dir, nodes):
+    rendered = {}
+    for node in nodes:
+        cached_view(node, directory, context, rendered, cache_dir)
+    return rendered
+
+
+def cached_view(node, directory, context, rendered, cache_dir=None):
     n_id = id(node.item)
     rend = {k: v for k, v in rendered.items() if k[0] == n_id}
     cnt = {(n_id, e): f for (n, e), f in context.items() if n == node}
@@ -981,7 +1550,10 @@ def cached_view(node, directory, context, rendered):
                         new_file.write(child(parent(line)))
             rend[k] = fpath
     else:
-        rend = node.view(osp.join(directory, context[(node, None)]), context)
+        rend = node.view(
+            osp.join(directory, context[(node, None)]), context,
+            cache_dir=cache_dir
+        )
         rendered.update(rend)
     return rend
 
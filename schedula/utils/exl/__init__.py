@@ -1,17 +1,108 @@
-__all__ = ['extract_dsp_from_excel']
+__all__ = ['extract_dsp_from_excel', 'load_dsp_from_excel', 'Recalculator']
 
+from .recalc import Recalculator
 
-def extract_dsp_from_excel(filename, workbook=None, sheets=None):
+
+def _cache_key(filename, sheets):
+    import hashlib
+    from ..._version import __version__
+    h = hashlib.sha1()
+    with open(filename, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    h.update(repr((list(sheets or ()), __version__)).encode('utf-8'))
+    return h.hexdigest()
+
+
+def _load_cache(path):
+    import dill
+    try:
+        with open(path, 'rb') as f:
+            return dill.load(f)
+    except Exception:  # Unreadable or stale cache files are misses.
+        return None
+
+
+def _dump_cache(path, obj):
+    import os
+    import dill
+    import tempfile
+    folder = os.path.dirname(path)
+    os.makedirs(folder, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=folder)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            dill.dump(obj, f)
+        os.replace(tmp, path)  # Atomic, concurrent starts may share the dir.
+    except Exception:
+        os.remove(tmp)
+        raise
+
+
+def load_dsp_from_excel(filename, cache_dir, sheets=None, read_only=False,
+                        processes=None):
+    """
+    Returns the dispatcher of an excel workbook, cached on disk.
+
+    The compiled dispatcher and the seed formulas are stored with dill in
+    `cache_dir`, keyed by the workbook bytes, the selected sheets and the
+    schedula version. A cache hit does not load the workbook, hence,
+    differently from :func:`extract_dsp_from_excel`, neither the seed cells
+    nor the excel wrapper are returned.
+
+    :param filename:
+        Excel file name.
+    :type filename: str
+
+    :param cache_dir:
+        Folder of the cache files.
+    :type cache_dir: str
+
+    :param sheets:
+        Sheets to be parsed. If None, all worksheets are parsed.
+    :type sheets: list[str], optional
+
+    :param read_only:
+        Load the workbook with a streaming pass on a cache miss?
+    :type read_only: bool
+
+    :param processes:
+        Number of processes used to scan the sheets when `read_only`.
+    :type processes: int, optional
+
+    :return:
+        Dispatcher and seed formulas (i.e., {cell address: formula}).
+    :rtype: (schedula.Dispatcher, dict)
+    """
+    import os.path as osp
+    path = osp.join(cache_dir, '%s.dill' % _cache_key(filename, sheets))
+    res = _load_cache(path)
+    if res is None:
+        d, seeds = extract_dsp_from_excel(
+            filename, sheets=sheets, read_only=read_only, processes=processes
+        )[:2]
+        res = d, {k: v[1] for k, v in seeds.items()}
+        _dump_cache(path, res)
+    return res
+
+
+def extract_dsp_from_excel(filename, workbook=None, sheets=None,
+                           read_only=False, processes=None):
     from pycel.excelwrapper import ExcelOpxWrapper
     from pycel.excelcompiler import ExcelCompiler
     import openpyxl
-    import functools
     from . import core
 
     exl = ExcelOpxWrapper(filename)
-    exl.workbookDO = exl.workbook = workbook or openpyxl.load_workbook(filename)
-
-    seeds = dict(core.get_seeds(exl, sheets))
+    if read_only and workbook is None:
+        workbook, formulas = core.stream_workbook(filename, processes)
+        exl.workbookDO = exl.workbook = workbook
+        seeds = dict(core.get_streamed_seeds(exl, formulas, sheets))
+    else:
+        exl.workbookDO = exl.workbook = workbook or openpyxl.load_workbook(
+            filename
+        )
+        seeds = dict(core.get_seeds(exl, sheets))
     graph = ExcelCompiler(filename, excel=exl).gen_graph(seed=list(seeds)).G
 
     from ... import Dispatcher
@@ -21,16 +112,17 @@ def extract_dsp_from_excel(filename, workbook=None, sheets=None):
         if isinstance(n, core.Cell) and not n.formula:
             d.add_data(data_id=node_id, default_value=n.value)
         else:
-            inputs = sorted(v.address() for v in graph.pred[n])
             if isinstance(n, core.CellRange):
-                fun_id, function = 'get_range(%s)' % node_id, core.get_range
+                fun_id, function = 'get_range(%s)' % node_id, core.RangeFunction
+                inputs = core.range_inputs(n)
             else:
-                fun_id, function = n.formula, core.evaluate_cell
+                fun_id, function = n.formula, core.CellFunction
+                inputs = sorted(v.address() for v in graph.pred[n])
                 inputs += sorted(core.get_named_range(fun_id))
 
             d.add_function(
                 function_id=fun_id, inputs=inputs or None, outputs=[node_id],
-                function=functools.partial(function, n, inputs)
+                function=function(n, inputs)
             )
 
     return d, seeds, exl
@@ -1,5 +1,9 @@
 from pycel.excelcompiler import *
+from pycel import excellib as _xl
+import functools
+import inspect
 import re
+import numpy as np
 
 __all__ = ['extract_dsp_from_excel']
 
@@ -15,10 +19,22 @@ def get_named_range(formula):
     return dict(m.groups()[::-1] for m in _re_indirect.finditer(formula))
 
 
+def _defined_names(excel):
+    try:
+        return excel._defined_names
+    except AttributeError:
+        names = {}
+        for n in excel.workbook.defined_names.definedName:
+            names.setdefault((n.name.upper(), n.localSheetId), n)
+        excel._defined_names = names
+        return names
+
+
 def find_nr(excel, name, scope):
-    for n in excel.workbook.defined_names.definedName:
-        if n.name.upper() == name.upper() and n.localSheetId == scope:
-            return n
+    try:
+        return _defined_names(excel)[(name.upper(), scope)]
+    except KeyError:
+        pass
     split_range(name)  # Raises a AttributeError if name is not range.
     return name
 
@@ -57,15 +73,246 @@ def get_seeds(excel, sheets=None):
                     yield address, (cell, formula)
 
 
-def get_range(rng, map_inputs, *args):
-    cells, nrows, ncols = rng.celladdrs, rng.nrows, rng.ncols
-    ind = map_inputs.index
-    if nrows == 1 or ncols == 1:
-        data = [args[ind(c)] for c in cells]
+def _read_rels(zf, path):
+    import posixpath
+    from openpyxl.xml.functions import fromstring
+    from openpyxl.xml.constants import PKG_REL_NS
+    folder, name = posixpath.split(path)
+    rels, path = {}, posixpath.join(folder, '_rels', '%s.rels' % name)
+    root = fromstring(zf.read(path))
+    for el in root.iter('{%s}Relationship' % PKG_REL_NS):
+        target = el.get('Target')
+        if target.startswith('/'):
+            target = target[1:]
+        else:
+            target = posixpath.normpath(posixpath.join(folder, target))
+        rels[el.get('Id')] = el.get('Type').rsplit('/', 1)[-1], target
+    return rels
+
+
+def _read_shared_strings(zf, path):
+    from openpyxl.xml.functions import iterparse
+    from openpyxl.xml.constants import SHEET_MAIN_NS
+    si, t = '{%s}si' % SHEET_MAIN_NS, '{%s}t' % SHEET_MAIN_NS
+    runs, strings = '{%s}r/%s' % (SHEET_MAIN_NS, t), []
+    with zf.open(path) as f:
+        for _, el in iterparse(f):
+            if el.tag == si:  # Phonetic runs (rPh) are skipped.
+                strings.append(''.join(
+                    e.text or '' for e in el.findall(t) + el.findall(runs)
+                ))
+                el.clear()
+    return strings
+
+
+def _read_workbook(filename):
+    import zipfile
+    from openpyxl.xml.functions import fromstring
+    from openpyxl.xml.constants import SHEET_MAIN_NS, REL_NS
+    from openpyxl.workbook.defined_name import DefinedNameList
+    with zipfile.ZipFile(filename) as zf:
+        path = next(t for k, t in _read_rels(zf, '').values()
+                    if k == 'officeDocument')
+        rels, root = _read_rels(zf, path), fromstring(zf.read(path))
+        sheets = [(el.get('name'),) + rels[el.get('{%s}id' % REL_NS)]
+                  for el in root.iter('{%s}sheet' % SHEET_MAIN_NS)]
+        names = root.find('{%s}definedNames' % SHEET_MAIN_NS)
+        names = DefinedNameList() if names is None else \
+            DefinedNameList.from_tree(names)
+        path = next((t for k, t in rels.values() if k == 'sharedStrings'), 0)
+        strings = _read_shared_strings(zf, path) if path else []
+    return sheets, names, strings
+
+
+def _scan_sheet(filename, path):
+    """
+    Reads the formulas and the values of a worksheet from its xml part.
+
+    :param filename:
+        Excel file name.
+    :type filename: str
+
+    :param path:
+        Path of the worksheet part in the excel package.
+    :type path: str
+
+    :return:
+        Cell records as (coordinate, formula or value) and shared string
+        records as (coordinate, string index).
+    :rtype: (list, list)
+    """
+    import zipfile
+    from openpyxl.formula.translate import Translator
+    from openpyxl.xml.functions import iterparse
+    from openpyxl.xml.constants import SHEET_MAIN_NS
+    from openpyxl.cell.read_only import _cast_number
+    ns = '{%s}%%s' % SHEET_MAIN_NS
+    c, row, f, v, t = ns % 'c', ns % 'row', ns % 'f', ns % 'v', ns % 't'
+    inline, masters, records, shared = ns % 'is', {}, [], []
+    with zipfile.ZipFile(filename) as zf, zf.open(path) as xml:
+        for _, el in iterparse(xml):
+            if el.tag == row:
+                el.clear()
+            if el.tag != c:
+                continue
+            coordinate, formula, kind = el.get('r'), el.find(f), el.get('t')
+            if formula is not None:
+                si = formula.get('si')
+                if formula.get('t') == 'shared' and not formula.text:
+                    value = masters[si].translate_formula(coordinate)
+                else:
+                    value = '=%s' % (formula.text or '')
+                    if formula.get('t') == 'shared':
+                        masters[si] = Translator(value, coordinate)
+            elif kind == 'inlineStr':
+                value = ''.join(e.text or '' for e in el.iter(t))
+            else:
+                value = el.findtext(v)
+                if value is None:
+                    pass
+                elif kind == 's':
+                    shared.append((coordinate, int(value)))
+                    value = None
+                elif kind == 'b':
+                    value = bool(int(value))
+                elif kind not in ('str', 'e'):
+                    value = _cast_number(value)
+            if value is not None:
+                records.append((coordinate, value))
+            el.clear()
+    return records, shared
+
+
+def stream_workbook(filename, processes=None):
+    """
+    Loads the values and formulas of a workbook with a streaming pass.
+
+    The xml parts of the worksheets are parsed directly and the non empty
+    cells are copied in a plain in-memory workbook, without styles (i.e.,
+    dates are kept as serial numbers). Chartsheets are not scanned.
+
+    :param filename:
+        Excel file name.
+    :type filename: str
+
+    :param processes:
+        Number of processes used to scan the worksheets (one per task).
+        If None, the worksheets are scanned in the current process.
+    :type processes: int, optional
+
+    :return:
+        Workbook and formulas as (sheet title, coordinate, formula).
+    :rtype: (openpyxl.Workbook, list)
+    """
+    import openpyxl
+    sheets, defined_names, strings = _read_workbook(filename)
+    paths = [p for title, kind, p in sheets if kind == 'worksheet']
+
+    if processes:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(processes) as executor:
+            values = list(executor.map(
+                _scan_sheet, [filename] * len(paths), paths
+            ))
     else:
-        data = [[args[ind(c)] for c in cells[i]] for i in range(len(cells))]
+        values = [_scan_sheet(filename, p) for p in paths]
 
-    return data
+    wb, formulas, values = openpyxl.Workbook(), [], iter(values)
+    wb.remove(wb.active)
+    wb.defined_names = defined_names
+    for title, kind, path in sheets:
+        if kind != 'worksheet':  # Keeps the sheet indices of defined names.
+            wb.create_chartsheet(title)
+            continue
+        records, shared = next(values)
+        ws = wb.create_sheet(title)
+        for coordinate, value in records:
+            if isinstance(value, str) and value.startswith('='):
+                formulas.append((title, coordinate, value))
+            ws[coordinate] = value
+        for coordinate, i in shared:
+            ws[coordinate] = strings[i]
+
+    return wb, formulas
+
+
+def get_streamed_seeds(excel, formulas, sheets=None):
+    sheets = sheets and set(sheets)
+    wb = excel.workbook
+    for title, coordinate, formula in formulas:
+        if not sheets or title in sheets:
+            cell = wb[title][coordinate]
+            cell.value = convert_formula(excel, formula, title)
+            yield '%s!%s' % (title, coordinate), (cell, formula)
+
+
+def _unresolved(address):
+    raise ValueError('Unresolved reference %s: it is not an input of the '
+                     'cell.' % address)
+
+
+def compile_expression(expression, inputs):
+    """
+    Replaces the `eval_cell`/`eval_range` calls of a cell python expression
+    with positional lookups (`_cells[i]`) in the function arguments.
+
+    The expression is tokenized, so string literals are left untouched. The
+    references that are not in the inputs are replaced with a call that raises
+    a descriptive error.
+
+    :param expression:
+        Cell python expression.
+    :type expression: str
+
+    :param inputs:
+        Input cell addresses.
+    :type inputs: list[str]
+
+    :return:
+        Compiled expression.
+    :rtype: str
+
+    Example::
+
+        >>> compile_expression('eval_cell("S!A1") + len("eval_cell")', ["S!A1"])
+        '_cells[0] + len("eval_cell")'
+        >>> compile_expression('eval_range("S!A1:B2")', [])
+        "_unresolved('S!A1:B2')"
+    """
+    import io
+    import ast
+    import tokenize
+    index = {k: i for i, k in enumerate(inputs)}
+    offsets = [0]
+    for line in expression.splitlines(True):
+        offsets.append(offsets[-1] + len(line))
+
+    def _pos(position):
+        return offsets[position[0] - 1] + position[1]
+
+    tokens = list(tokenize.generate_tokens(io.StringIO(expression).readline))
+    res, last = [], 0
+    for i, tok in enumerate(tokens):
+        if tok.type != tokenize.NAME or \
+                tok.string not in ('eval_cell', 'eval_range'):
+            continue
+        call = tokens[i + 1:i + 4]
+        if len(call) < 3 or call[0].string != '(' or \
+                call[1].type != tokenize.STRING or call[2].string != ')':
+            continue
+        address = ast.literal_eval(call[1].string)
+        res.append(expression[last:_pos(tok.start)])
+        if address in index:
+            res.append('_cells[%d]' % index[address])
+        else:
+            res.append('_unresolved(%r)' % address)
+        last = _pos(call[2].end)
+    res.append(expression[last:])
+    return ''.join(res)
+
+
+def get_range(rng, map_inputs, *args):
+    return RangeFunction(rng, map_inputs)(*args)
 
 
 def evaluate_cell(cell, map_inputs, *args):
@@ -80,3 +327,185 @@ def evaluate_cell(cell, map_inputs, *args):
     except Exception as e:
         raise ValueError("Problem evalling: %s for %s, %s" % (
         e, cell.address(), cell.python_expression))
+
+
+class RangeFunction(object):
+    """
+    It builds the value of a cell range as a numpy array.
+
+    The position of each cell in the function arguments is resolved once at
+    construction time. When the cells are contiguous in the arguments, the
+    array is built from a single slice.
+    """
+
+    def __init__(self, rng, inputs):
+        index = {k: i for i, k in enumerate(inputs)}
+        cells = rng.celladdrs
+        if rng.nrows == 1 or rng.ncols == 1:
+            self.shape = None
+        else:
+            cells = [c for row in cells for c in row]
+            self.shape = (len(rng.celladdrs), len(rng.celladdrs[0]))
+        self.positions = [index[c] for c in cells]
+        start = self.positions[0] if self.positions else 0
+        if self.positions == list(range(start, start + len(self.positions))):
+            self.positions = slice(start, start + len(self.positions))
+
+    def __call__(self, *args):
+        if isinstance(self.positions, slice):
+            values = args[self.positions]
+        else:
+            values = [args[i] for i in self.positions]
+
+        data = np.array(values)
+        # Avoid casting numbers to str and booleans to numbers.
+        if data.dtype.kind not in 'biuf' or (
+                data.dtype.kind != 'b' and bool in set(map(type, values))):
+            data = np.empty(len(values), dtype=object)
+            data[:] = values
+
+        if self.shape:
+            data = data.reshape(self.shape)
+        return data
+
+
+def range_inputs(rng):
+    """
+    Returns the cell addresses of a range in the order used by
+    :class:`RangeFunction` to build the array from a single slice.
+
+    :param rng:
+        Cell range.
+    :type rng: CellRange
+
+    :return:
+        Cell addresses.
+    :rtype: list
+    """
+    cells = rng.celladdrs
+    if not (rng.nrows == 1 or rng.ncols == 1):
+        cells = [c for row in cells for c in row]
+    return list(cells)
+
+
+def _numeric_values(args):
+    values = []
+    for a in args:
+        if isinstance(a, np.ndarray):
+            if a.dtype.kind not in 'iuf':
+                return None
+            values.append(a.ravel())
+        elif isinstance(a, (int, float)) and not isinstance(a, bool):
+            values.append(np.array([a]))
+        else:
+            return None
+    return np.concatenate(values) if values else None
+
+
+def _tolist(args):
+    return tuple(a.tolist() if isinstance(a, np.ndarray) else a for a in args)
+
+
+def _list_args(func):
+    @functools.wraps(func)
+    def _func(*args, **kwargs):
+        return func(*_tolist(args), **kwargs)
+
+    return _func
+
+
+def _vectorize(func):
+    @functools.wraps(func)
+    def _func(*args):
+        values = _numeric_values(args)
+        if values is None or not values.size:
+            return getattr(_xl, func.__name__)(*_tolist(args))
+        return func(values).item()
+
+    return _func
+
+
+@_vectorize
+def xsum(values):
+    return np.sum(values)
+
+
+@_vectorize
+def average(values):
+    return np.mean(values)
+
+
+@_vectorize
+def xmax(values):
+    return np.max(values)
+
+
+@_vectorize
+def xmin(values):
+    return np.min(values)
+
+
+@_vectorize
+def count(values):
+    return np.int64(values.size)
+
+
+def sumproduct(*ranges):
+    if ranges and all(isinstance(r, np.ndarray) and r.dtype.kind in 'iuf'
+                      for r in ranges):
+        size = ranges[0].size
+        if all(r.size == size for r in ranges):
+            res = np.ones(size, dtype=np.result_type(*ranges))
+            for r in ranges:
+                res *= r.ravel()
+            return res.sum().item()
+    return _xl.sumproduct(*_tolist(ranges))
+
+
+def _wrap_excellib(namespace, vectorized):
+    # Non vectorized excel functions receive the ranges as lists.
+    for k, f in list(vars(_xl).items()):
+        if inspect.isfunction(f) and f.__module__ == _xl.__name__ and \
+                k not in vectorized:
+            namespace[k] = _list_args(f)
+
+
+_wrap_excellib(globals(), (
+    'xsum', 'average', 'xmax', 'xmin', 'count', 'sumproduct'
+))
+
+
+class CellFunction(object):
+    """
+    It evaluates a formula cell with a function compiled once.
+
+    The `eval_cell`/`eval_range` calls of the cell python expression are
+    replaced by positional lookups in the function arguments, so each call is
+    a plain function call instead of an `eval` with a linear input search.
+    """
+
+    def __init__(self, cell, inputs):
+        self.address = cell.address()
+        self.python_expression = cell.python_expression
+        self.inputs = inputs
+        self._compile()
+
+    def _compile(self):
+        expr = compile_expression(self.python_expression, self.inputs)
+        self.function = eval('lambda *_cells: %s' % expr, globals())
+
+    def __call__(self, *args):
+        try:
+            return self.function(*args)
+        except Exception as e:
+            raise ValueError("Problem evalling: %s for %s, %s" % (
+                e, self.address, self.python_expression))
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop('function', None)  # Lambda functions cannot be pickled.
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._compile()
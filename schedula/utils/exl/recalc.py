@@ -0,0 +1,234 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+#
+# Copyright 2014-2016 European Commission (JRC);
+# Licensed under the EUPL (the 'Licence');
+# You may not use this work except in compliance with the Licence.
+# You may obtain a copy of the Licence at: http://ec.europa.eu/idabc/eupl
+
+"""
+It provides an incremental recalculation engine for excel dispatchers.
+"""
+
+__author__ = 'Vincenzo Arcidiacono'
+
+from ..cst import NONE
+
+
+class Recalculator(object):
+    """
+    Keeps the cell values of a dispatcher and, when some input cells change,
+    re-evaluates only the formulas that depend on them (dirty cone), in
+    topological order.
+
+    :param dsp:
+        A dispatcher returned by :func:`extract_dsp_from_excel`. Its graph must
+        be acyclic.
+    :type dsp: schedula.Dispatcher
+
+    :param inputs:
+        Initial input cell values.
+    :type inputs: dict, optional
+
+    Example::
+
+        >>> from schedula import Dispatcher
+        >>> dsp = Dispatcher()
+        >>> dsp.add_data('A1', default_value=1)
+        'A1'
+        >>> dsp.add_function('=A1+1', lambda x: x + 1, ['A1'], ['B1'])
+        '=A1+1'
+        >>> calc = Recalculator(dsp)
+        >>> calc.values['B1']
+        2
+        >>> calc.set_inputs({'A1': 3})
+        {'B1': 4}
+    """
+
+    def __init__(self, dsp, inputs=None):
+        from networkx import topological_sort
+        self.dsp, nodes = dsp, dsp.nodes
+        order = [k for k in topological_sort(dsp.dmap)
+                 if nodes[k]['type'] == 'function']
+        self.order = {k: i for i, k in enumerate(order)}
+        self.dependents = {}
+        for k in order:
+            for i in nodes[k]['inputs']:
+                self.dependents.setdefault(i, []).append(k)
+
+        sol = dsp.dispatch(inputs=inputs)
+        self.values, self.errors = dict(sol), dict(sol._errors)
+
+    def _evaluate(self, fun_id):
+        node = self.dsp.nodes[fun_id]
+        outputs, values = node['outputs'], self.values
+        self.errors.pop(fun_id, None)
+        try:
+            args = [values[k] for k in node['inputs']]
+        except KeyError:  # Some inputs have not been estimated.
+            return outputs, ()
+
+        try:
+            res = node['function'](*args)
+        except Exception as ex:
+            msg = "Failed DISPATCHING '%s' due to:\n  %r"
+            self.errors[fun_id] = msg % (fun_id, ex)
+            return outputs, ()
+
+        return outputs, [res] if len(outputs) == 1 else res
+
+    def _dirty_cone(self, data_ids):
+        dependents, nodes, visited = self.dependents, self.dsp.nodes, set()
+        stack = list(data_ids)
+        while stack:
+            for k in dependents.get(stack.pop(), ()):
+                if k not in visited:
+                    visited.add(k)
+                    stack.extend(nodes[k]['outputs'])
+        return sorted(visited, key=self.order.get)
+
+    def set_inputs(self, inputs):
+        """
+        Sets the values of input cells and recalculates the dependent cells.
+
+        :param inputs:
+            Input cell values.
+        :type inputs: dict
+
+        :return:
+            Recalculated cell values (cells that could not be estimated are
+            omitted).
+        :rtype: dict
+        """
+        values, changed = self.values, {}
+        values.update(inputs)
+
+        for fun_id in self._dirty_cone(inputs):
+            outputs, res = self._evaluate(fun_id)
+            for k in outputs:
+                values.pop(k, None)
+            for k, v in zip(outputs, res):
+                values[k] = changed[k] = v
+
+        return changed
+
+    def evaluate_scenarios(self, scenarios, outputs=None):
+        """
+        Evaluates the workbook on a table of input scenarios.
+
+        The formulas are evaluated across all scenarios at once with array
+        semantics. When a formula cannot be vectorized (e.g., it raises or it
+        does not return one value per scenario), it is evaluated scenario by
+        scenario.
+
+        :param scenarios:
+            Input cell values, one column (of equal length) per input cell.
+        :type scenarios: dict[str, list | numpy.ndarray]
+
+        :param outputs:
+            Cells to return. If None, all the cells that depend on the inputs
+            are returned.
+        :type outputs: list[str], optional
+
+        :return:
+            Output table, one array per cell. Scenarios that cannot be
+            estimated are None.
+        :rtype: dict[str, numpy.ndarray]
+
+        Example::
+
+            >>> import math
+            >>> from schedula import Dispatcher
+            >>> dsp = Dispatcher()
+            >>> dsp.add_function('=A1+1', lambda x: x + 1, ['A1'], ['B1'])
+            '=A1+1'
+            >>> dsp.add_function('=SQRT(B1)', math.sqrt, ['B1'], ['C1'])
+            '=SQRT(B1)'
+            >>> calc = Recalculator(dsp)
+            >>> res = calc.evaluate_scenarios({'A1': [0, 3, -2]})
+            >>> res['B1']
+            array([ 1,  4, -1])
+            >>> res['C1']
+            array([1.0, 2.0, None], dtype=object)
+        """
+        import numpy as np
+        scenarios = {k: np.asarray(v) for k, v in scenarios.items()}
+        if len({len(v) for v in scenarios.values()}) > 1:
+            raise ValueError('Scenario columns must have the same length.')
+        n = len(next(iter(scenarios.values()))) if scenarios else 0
+
+        values, nodes, varying = dict(self.values), self.dsp.nodes, set()
+        values.update(scenarios)
+        varying.update(scenarios)
+
+        for fun_id in self._dirty_cone(scenarios):
+            node = nodes[fun_id]
+            args = [values.get(k, NONE) for k in node['inputs']]
+            flags = [k in varying for k in node['inputs']]
+            res = _evaluate_vector(node['function'], args, flags, n)
+            if len(node['outputs']) == 1:
+                res = [res]
+            else:
+                res = [_column(res, i) for i in range(len(node['outputs']))]
+            for k, v in zip(node['outputs'], res):
+                values[k] = v
+                varying.add(k)
+
+        if outputs is None:
+            outputs = [k for k in varying if k not in scenarios]
+
+        res = {}
+        for k in outputs:
+            v = values.get(k, NONE)
+            if k not in varying:
+                v = np.array([v] * n, dtype=object)
+                if v.size and v[0] is not NONE:
+                    v = _as_numeric(v)
+            if v.dtype == object:
+                v[[x is NONE for x in v]] = None
+            res[k] = v
+        return res
+
+
+def _as_numeric(res):
+    import numpy as np
+    try:
+        v = np.array(res.tolist())
+        if v.shape == res.shape and v.dtype.kind in 'biuf':
+            return v
+    except Exception:
+        pass
+    return res
+
+
+def _column(res, index):
+    import numpy as np
+    col = np.empty(len(res), dtype=object)
+    col[:] = [NONE if r is NONE else r[index] for r in res]
+    return _as_numeric(col)
+
+
+def _evaluate_vector(function, args, flags, n):
+    import numpy as np
+    vectors = [a for a, f in zip(args, flags) if f]
+    if all(isinstance(a, np.ndarray) and a.dtype.kind in 'biuf'
+           for a in vectors) and not any(a is NONE for a in args):
+        try:
+            with np.errstate(all='raise'):  # Excel errors instead of nan/inf.
+                res = function(*args)
+            if isinstance(res, np.ndarray) and res.shape == (n,):
+                return res
+        except Exception:
+            pass
+
+    res = np.empty(n, dtype=object)
+    for i in range(n):
+        a = [v[i] if f else v for v, f in zip(args, flags)]
+        if any(v is NONE for v in a):
+            res[i] = NONE
+            continue
+        try:
+            res[i] = function(*a)
+        except Exception:
+            res[i] = NONE
+    return _as_numeric(res)
@@ -12,8 +12,10 @@ It contains a comprehensive list of all modules and classes within dispatcher.
 Docstrings should provide sufficient understanding for any individual function.
 """
 import collections
+import contextlib
 import heapq
 import logging
+import threading
 from datetime import datetime
 from .alg import add_edge_fun, remove_edge_fun, get_full_pipe, _sort_sk_wait_in
 from .cst import START, NONE, PLOT
@@ -24,6 +26,38 @@ from .base import Base
 
 log = logging.getLogger(__name__)
 
+_local = threading.local()
+
+
+@contextlib.contextmanager
+def observe_nodes(observer):
+    """
+    Calls an observer after each function node evaluated by the current thread
+    within the context.
+
+    :param observer:
+        Function called as `observer(solution, node_id, duration)`.
+    :type observer: callable
+
+    Example::
+
+        >>> from schedula import Dispatcher
+        >>> dsp = Dispatcher()
+        >>> dsp.add_function('max', max, ['a', 'b'], ['c'])
+        'max'
+        >>> records = []
+        >>> with observe_nodes(lambda s, k, d: records.append(k)):
+        ...     sol = dsp.dispatch({'a': 1, 'b': 2})
+        >>> records
+        ['max']
+    """
+    previous = getattr(_local, 'observer', None)
+    _local.observer = observer
+    try:
+        yield
+    finally:
+        _local.observer = previous
+
 
 class Solution(Base, collections.OrderedDict):
     def __hash__(self):
@@ -43,6 +77,7 @@ class Solution(Base, collections.OrderedDict):
         self._wait_in = wait_in or {}
         self.outputs = set(outputs or ())
         self.parent = None
+        self._local_name = self._full_name = self._full_pipe = None
 
         from .. import Dispatcher
         self._set_dsp_features(dsp or Dispatcher())
@@ -238,7 +273,24 @@ class Solution(Base, collections.OrderedDict):
 
     @property
     def pipe(self):
-        return get_full_pipe(self)
+        """
+        Returns the full pipe of the last dispatch run.
+
+        It is built incrementally, only the new nodes of the run are added to
+        an internal pipe. A shallow copy of it is returned, so the returned
+        pipe does not change with the run, but its items are shared.
+
+        :return:
+            Full pipe of the dispatch run.
+        :rtype: schedula.utils.alg.DspPipe
+        """
+        full = self._full_pipe
+        if full is None or full[0] is not self._pipe:  # New run.
+            full = None, 0, None
+        # The last node may have been visited after the previous call.
+        pipe = get_full_pipe(self, pipe=full[2], start=max(full[1] - 1, 0))
+        self._full_pipe = self._pipe, len(self._pipe), pipe
+        return pipe.copy()
 
     def copy_structure(self, **kwargs):
         sol = self.__class__(
@@ -275,17 +327,38 @@ class Solution(Base, collections.OrderedDict):
         :rtype: tuple[str], tuple[Dispatcher]
         """
 
-        sub_sol = self.sub_sol
-        def _get_id(path):
-            p, i = path[:-1], path[-1:]
+        index, name = self._get_local_name()
+        p = self.sub_sol[index].parent
+        base = p[1].full_name if p else None  # Cached by the parent.
+        cache = self._full_name
+        if cache is None or cache[0] is not p or cache[1] is not base:
+            full = (base + p[:1] if p else ()) + name
+            cache = self._full_name = p, base, full
+        return cache[2]
+
+    def _get_local_name(self):
+        """
+        Returns the index of the solution that has been created by the
+        dispatch (root) and the node id relative to it.
+
+        The result is cached, because it depends only on the indices.
+
+        :return:
+            Root index and relative node id.
+        :rtype: tuple[int], tuple[str]
+        """
+        if self._local_name is None:
+            p, i = self.index[:-1], self.index[-1:]
+            res = self.index, ()
             if p:
-                for k, v in sub_sol[p].nodes.items():
+                sol = self.sub_sol[p]
+                for k, v in sol.nodes.items():
                     if v['index'] == i:
-                        return _get_id(p) + (k,)
-            s = sub_sol[path]
-            return (s.parent and (s.parent[1].full_name + s.parent[:1])) or ()
-
-        return _get_id(self.index)
+                        index, name = sol._get_local_name()
+                        res = index, name + (k,)
+                        break
+            self._local_name = res
+        return self._local_name
 
     def _add_out_dsp_inputs(self):
         # Nodes that are out of the dispatcher nodes.
@@ -686,6 +759,7 @@ class Solution(Base, collections.OrderedDict):
                     res = f(res)
 
                 attr['duration'] = datetime.today() - attr['started']
+                self._observe_node(node_id, attr['duration'])
 
                 # Save node.
                 self.workflow.add_node(node_id, **attr)
@@ -696,6 +770,7 @@ class Solution(Base, collections.OrderedDict):
         except Exception as ex:
             if isinstance(ex, DispatcherError):  # Save intermediate results.
                 attr['duration'] = datetime.today() - attr['started']
+                self._observe_node(node_id, attr['duration'])
 
                 # Save node.
                 self.workflow.add_node(node_id, **attr)
@@ -710,6 +785,11 @@ class Solution(Base, collections.OrderedDict):
 
         return True  # Return that the output have been evaluated correctly.
 
+    def _observe_node(self, node_id, duration):
+        observer = getattr(_local, 'observer', None)
+        if observer:
+            observer(self, node_id, duration)
+
     def _add_initial_value(self, data_id, value, initial_dist=0.0,
                            fringe=None, check_cutoff=None, no_call=None):
         """
@@ -12,19 +12,32 @@ It provides functions to build a flask app from a dispatcher.
 
 __author__ = 'Vincenzo Arcidiacono'
 
+import contextlib
 import functools
 import logging
 import tempfile
+import threading
 import os.path as osp
 from .dsp import SubDispatch, parent_func
 
 log = logging.getLogger(__name__)
 
 
-def create_flask_app(dsp, import_name=None, **options):
+def create_flask_app(dsp, import_name=None, workers=None, max_queue=None,
+                     stream=False, lazy=False, cache=None, metrics=False,
+                     **options):
     """
     Creates a Flask app from a dispatcher.
 
+    Each request is dispatched with its own solution and stopper, so the app
+    can be served by a threaded WSGI server.
+
+    Each rule accepts a call (`{"args": [...], "kwargs": {...}}`) or a list of
+    calls (batch). A batch returns the calls in order, each one with its
+    `return` value or its `error`. The calls of a batch are evaluated
+    independently, in parallel when there are workers, so a batch saves the
+    HTTP round trips but not the planning of each dispatch.
+
     :param dsp:
         A dispatcher that identifies the model adopted.
     :type dsp: schedula.Dispatcher
@@ -33,6 +46,34 @@ def create_flask_app(dsp, import_name=None, **options):
         The name of the application package.
     :type import_name: str, optional
 
+    :param workers:
+        Number of worker threads that execute the requests. If None, the
+        requests are executed in the server threads.
+    :type workers: int, optional
+
+    :param max_queue:
+        Maximum number of requests waiting for a worker. When the workers and
+        the queue are saturated, the app responds with HTTP 503.
+    :type max_queue: int, optional
+
+    :param stream:
+        Stream the dispatch responses as newline-delimited JSON records?
+    :type stream: bool, optional
+
+    :param lazy:
+        Resolve the node rules on demand instead of registering all of them?
+    :type lazy: bool, optional
+
+    :param cache:
+        Response cache, keyed by rule and request JSON. The responses have an
+        `ETag` and requests with a matching `If-None-Match` get HTTP 304.
+    :type cache: ResponseCache, optional
+
+    :param metrics:
+        Add a `/metrics` route (GET) with the runtime statistics in the
+        Prometheus text format? It can be also a :class:`Metrics` instance.
+    :type metrics: bool | Metrics, optional
+
     :param options:
         Flask options.
     :type options: dict, optional
@@ -47,20 +88,512 @@ def create_flask_app(dsp, import_name=None, **options):
 
     app = Flask(import_name, **options)
 
-    add_dsp_url_rules(dsp, app, '/')
+    if metrics:
+        from flask import Response
+        if not isinstance(metrics, Metrics):
+            metrics = Metrics()
+
+        def metrics_handler():
+            return Response(metrics.render(), mimetype='text/plain')
+
+        app.add_url_rule('/metrics', 'metrics', metrics_handler)
+    else:
+        metrics = None
+
+    pool = RequestPool(workers, max_queue)
+    add_dsp_url_rules(
+        dsp, app, '/', stream=stream, lazy=lazy,
+        func_handler_maker=functools.partial(
+            _func_handler_maker, pool=pool, cache=cache, metrics=metrics
+        )
+    )
 
     return app
 
 
-def _func_handler_maker(func):
+class RequestPool(object):
+    """
+    Executes the request calls in a pool of worker threads with a bounded
+    number of pending requests.
+
+    :param workers:
+        Number of worker threads. If None, the calls are executed in the
+        calling thread.
+    :type workers: int, optional
+
+    :param max_queue:
+        Maximum number of calls waiting for a worker. If None, the queue is
+        unbounded.
+    :type max_queue: int, optional
+    """
+
+    def __init__(self, workers=None, max_queue=None):
+        self.executor = self.slots = None
+        if workers:
+            from concurrent.futures import ThreadPoolExecutor
+            self.executor = ThreadPoolExecutor(workers)
+        if max_queue is not None:
+            self.slots = threading.BoundedSemaphore((workers or 1) + max_queue)
+
+    def _acquire(self):
+        if self.slots and not self.slots.acquire(False):
+            from flask import abort
+            abort(503)  # Server saturated.
+
+    def _release(self):
+        if self.slots:
+            self.slots.release()
+
+    def __call__(self, func, *args):
+        self._acquire()
+        try:
+            if self.executor:
+                return self.executor.submit(func, *args).result()
+            return func(*args)
+        finally:
+            self._release()
+
+    def map(self, func, *iterables):
+        """
+        Executes a batch of calls, in parallel when the pool has workers.
+
+        The whole batch takes one queue slot.
+
+        :return:
+            Results in the same order of the inputs.
+        :rtype: list
+        """
+        self._acquire()
+        try:
+            if self.executor:
+                return list(self.executor.map(func, *iterables))
+            return list(map(func, *iterables))
+        finally:
+            self._release()
+
+
+def _is_dispatch(func):
+    from .. import Dispatcher
+    return isinstance(getattr(func, '__self__', None), Dispatcher) and \
+           func.__name__ == 'dispatch'
+
+
+def _call(func, args, kwargs):
+    # Isolate the request from the class-wide stopper.
+    if _is_dispatch(func):
+        kwargs = dict(kwargs)
+        kwargs.setdefault('stopper', threading.Event())
+    elif isinstance(parent_func(func), SubDispatch):
+        kwargs = dict(kwargs)
+        kwargs.setdefault('_stopper', threading.Event())
+    return func(*args, **kwargs)
+
+
+def _call_item(func, data):
+    if not isinstance(data, dict):  # Invalid items fail on their own.
+        msg = 'A call must be an object, not %s.' % type(data).__name__
+        return {'error': '%r' % TypeError(msg)}
+    try:
+        args, kwargs = data.get('args', []), data.get('kwargs', {})
+        if not isinstance(args, list) or not isinstance(kwargs, dict):
+            msg = 'The call args must be a list and kwargs an object.'
+            raise TypeError(msg)
+        data['return'] = _call(func, args, kwargs)
+    except Exception as ex:
+        data['error'] = '%r' % ex
+    return data
+
+
+def _observed(metrics, func, *args, **kwargs):
+    with metrics.observe_nodes():
+        return func(*args, **kwargs)
+
+
+def _stream_dispatch(dsp, args, kwargs, put, metrics=None):
+    from .cst import NONE
+
+    class StreamSolution(dsp.solution.__class__):
+        def __setitem__(self, key, value):
+            super(StreamSolution, self).__setitem__(key, value)
+            if value is not NONE:
+                put({'id': key, 'value': value})
+
+    # Shallow dispatcher copy to dispatch with the streaming solution.
+    d = dsp.copy_structure(dmap=dsp.dmap, default_values=dsp.default_values)
+    d.solution = StreamSolution(d, _empty=True)
+    summary, dispatch = {'done': True}, d.dispatch
+    if metrics:
+        dispatch = functools.partial(_observed, metrics, dispatch)
+    try:
+        dispatch(*args, **kwargs)
+    except Exception as ex:
+        summary['error'] = '%r' % ex
+    summary['errors'] = dict(d.solution._errors)
+    if metrics:
+        metrics.observe_errors(d.solution)
+    put(summary)
+
+
+def _ndjson_response(func, pool, data, metrics=None):
+    import json
+    from queue import Queue
+    from flask import Response
+    pool._acquire()
+    stopper, records = threading.Event(), Queue()
+    kwargs = dict(data.get('kwargs', {}), stopper=stopper)
+
+    def _run():
+        try:
+            _stream_dispatch(
+                func.__self__, data.get('args', ()), kwargs, records.put,
+                metrics
+            )
+        finally:
+            pool._release()
+
+    if pool.executor:
+        pool.executor.submit(_run)
+    else:
+        threading.Thread(target=_run, daemon=True).start()
+
+    def _generate():
+        while True:
+            record = records.get()
+            yield json.dumps(record, default=str) + '\n'
+            if record.get('done') is True:
+                break
+
+    response = Response(_generate(), mimetype='application/x-ndjson')
+    # Abort the dispatch if the client disconnects, even before the stream
+    # starts.
+    response.call_on_close(stopper.set)
+    return response
+
+
+class ResponseCache(object):
+    """
+    LRU cache of serialized responses with a time to live.
+
+    :param maxsize:
+        Maximum number of cached responses.
+    :type maxsize: int
+
+    :param ttl:
+        Time to live of the cached responses [s]. If None, they do not expire.
+    :type ttl: float, optional
+    """
+
+    def __init__(self, maxsize=1024, ttl=None):
+        from collections import OrderedDict
+        self.maxsize, self.ttl = maxsize, ttl
+        self.data, self.lock = OrderedDict(), threading.Lock()
+
+    @staticmethod
+    def key(rule, data):
+        """
+        Returns the cache key of a request.
+
+        :param rule:
+            Request rule.
+        :type rule: str
+
+        :param data:
+            Request JSON data.
+        :type data: dict | list
+
+        :return:
+            Rule and hash of the canonical JSON data.
+        :rtype: (str, str)
+        """
+        import json
+        import hashlib
+        data = json.dumps(data, sort_keys=True, separators=(',', ':'),
+                          default=str)
+        return rule, hashlib.sha1(data.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        import time
+        with self.lock:
+            try:
+                expires, value = self.data[key]
+            except KeyError:
+                return None
+            if expires is not None and expires < time.time():
+                del self.data[key]
+                return None
+            self.data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        import time
+        expires = self.ttl and time.time() + self.ttl
+        with self.lock:
+            self.data[key] = expires, value
+            self.data.move_to_end(key)
+            while len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.data.clear()
+
+
+def _cached_response(cache, func):
+    import hashlib
+    from flask import request, Response
+    key = cache.key(request.path, request.get_json(force=True))
+    value = cache.get(key)
+    if value is None:
+        response = func()
+        if response.status_code != 200:
+            return response
+        body = response.get_data()
+        value = hashlib.sha1(body).hexdigest(), body, response.mimetype
+        cache.set(key, value)
+    etag, body, mimetype = value
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)  # Works also with POST requests.
+    else:
+        response = Response(body, mimetype=mimetype)
+    response.set_etag(etag)
+    return response
+
+
+class _Histogram(object):
+    def __init__(self, buckets):
+        self.buckets, self.counts = buckets, [0] * len(buckets)
+        self.sum = self.count = 0
+
+    def observe(self, value):
+        import bisect
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def lines(self, name, labels):
+        cumulative, lbs = 0, labels and '%s,' % labels
+        for b, c in zip(self.buckets, self.counts):
+            cumulative += c
+            le = '+Inf' if b == float('inf') else repr(float(b))
+            yield '%s_bucket{%sle="%s"} %d' % (name, lbs, le, cumulative)
+        lbs = labels and '{%s}' % labels
+        yield '%s_sum%s %r' % (name, lbs, float(self.sum))
+        yield '%s_count%s %d' % (name, lbs, self.count)
+
+
+def _label(**labels):
+    def _esc(v):
+        v = str(v).replace('\\', '\\\\').replace('"', '\\"')
+        return v.replace('\n', '\\n')
+
+    labels = sorted(labels.items())
+    return ','.join('%s="%s"' % (k, _esc(v)) for k, v in labels)
+
+
+class Metrics(object):
+    """
+    Collects the runtime statistics of the web requests and exports them in
+    the Prometheus text format.
+
+    The node durations are collected while dispatching, by an observer of the
+    evaluated function nodes (see :func:`schedula.utils.sol.observe_nodes`).
+    The node names are resolved once the dispatch is done.
+
+    :param buckets:
+        Upper bounds of the duration histogram buckets [s].
+    :type buckets: tuple[float], optional
+    """
+
+    buckets = (.001, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10)
+
+    def __init__(self, buckets=None):
+        self.buckets = tuple(sorted(buckets or self.buckets)) + (float('inf'),)
+        self.lock = threading.Lock()
+        self.requests, self.nodes = {}, {}
+        self.request_errors, self.node_errors = {}, {}
+        self.active = 0
+
+    def _observe(self, histograms, key, value):
+        try:
+            h = histograms[key]
+        except KeyError:
+            h = histograms[key] = _Histogram(self.buckets)
+        h.observe(value)
+
+    def observe_request(self, rule, duration, error=False):
+        """
+        Records a web request.
+
+        :param rule:
+            Request rule.
+        :type rule: str
+
+        :param duration:
+            Request duration [s].
+        :type duration: float
+
+        :param error:
+            Did the request fail?
+        :type error: bool
+        """
+        with self.lock:
+            self._observe(self.requests, rule, duration)
+            if error:
+                errors = self.request_errors
+                errors[rule] = errors.get(rule, 0) + 1
+
+    @contextlib.contextmanager
+    def observe_nodes(self):
+        """
+        Records the durations of the function nodes evaluated by the current
+        thread within the context.
+        """
+        from .sol import observe_nodes
+        records = []
+        try:
+            with observe_nodes(lambda *args: records.append(args)):
+                yield
+        finally:
+            names, durations = {}, []
+            for s, k, d in records:
+                try:
+                    prefix = names[id(s)]
+                except KeyError:
+                    prefix = names[id(s)] = s.full_name
+                path = '/'.join(map(str, prefix + (k,)))
+                durations.append((path, d.total_seconds()))
+            with self.lock:
+                for k, v in durations:
+                    self._observe(self.nodes, k, v)
+
+    def observe_errors(self, solution):
+        """
+        Records the function node errors of a dispatch.
+
+        :param solution:
+            Dispatch solution.
+        :type solution: schedula.utils.Solution
+        """
+        from .sol import Solution
+        if not isinstance(solution, Solution):
+            return
+        errors = list(solution._errors)
+        with self.lock:
+            for k in errors:
+                self.node_errors[k] = self.node_errors.get(k, 0) + 1
+
+    def __enter__(self):
+        with self.lock:
+            self.active += 1
+
+    def __exit__(self, *args):
+        with self.lock:
+            self.active -= 1
+
+    def render(self):
+        """
+        Returns the metrics in the Prometheus text format.
+
+        :return:
+            Metrics.
+        :rtype: str
+        """
+        lines, name = [], 'schedula_request_duration_seconds'
+        with self.lock:
+            lines += ['# HELP %s Web request duration.' % name,
+                      '# TYPE %s histogram' % name]
+            for k, h in sorted(self.requests.items()):
+                lines.extend(h.lines(name, _label(rule=k)))
+
+            name = 'schedula_request_errors_total'
+            lines += ['# HELP %s Failed web requests.' % name,
+                      '# TYPE %s counter' % name]
+            for k, v in sorted(self.request_errors.items()):
+                lines.append('%s{%s} %d' % (name, _label(rule=k), v))
+
+            name = 'schedula_active_requests'
+            lines += ['# HELP %s Web requests in progress.' % name,
+                      '# TYPE %s gauge' % name, '%s %d' % (name, self.active)]
+
+            name = 'schedula_node_duration_seconds'
+            lines += ['# HELP %s Function node duration.' % name,
+                      '# TYPE %s histogram' % name]
+            for k, h in sorted(self.nodes.items()):
+                lines.extend(h.lines(name, _label(node=k)))
+
+            name = 'schedula_node_errors_total'
+            lines += ['# HELP %s Failed node dispatches.' % name,
+                      '# TYPE %s counter' % name]
+            for k, v in sorted(self.node_errors.items()):
+                lines.append('%s{%s} %d' % (name, _label(node=k), v))
+        return '\n'.join(lines) + '\n'
+
+
+def _metered_response(metrics, func):
+    import time
+    from flask import request
+    rule, start, response = request.path, time.time(), None
+
+    def _observe():
+        metrics.__exit__()
+        error = response is None or response.status_code >= 400
+        metrics.observe_request(rule, time.time() - start, error)
+
+    metrics.__enter__()
+    try:
+        response = func()
+    finally:
+        if response is not None and response.is_streamed:
+            response.call_on_close(_observe)  # When the stream is consumed.
+        else:
+            _observe()
+    return response
+
+
+def _func_handler_maker(func, pool=None, stream=False, cache=None,
+                        metrics=None):
     from flask import request, jsonify
+    pool = pool or RequestPool()
+    stream = stream and _is_dispatch(func)
+    if isinstance(func, functools.partial) and \
+            func.func.__name__ == 'set_default_value':
+        edit_cache, cache = cache, None  # Editing invalidates the responses.
+    else:
+        edit_cache = None
+
+    call = functools.partial(_call, func)
+    call_item = functools.partial(_call_item, func)
+    if metrics:
+        call = functools.partial(_observed, metrics, call)
+        call_item = functools.partial(_observed, metrics, call_item)
 
     def func_handler():
         data = request.get_json(force=True)
-        data['return'] = func(*data.get('args', ()), **data.get('kwargs', {}))
+        if isinstance(data, list):  # Batch of calls.
+            res = pool.map(call_item, data)
+            if edit_cache:
+                edit_cache.clear()
+            if metrics:
+                for d in res:
+                    metrics.observe_errors(d.get('return'))
+            return jsonify(res)
+        if stream:
+            return _ndjson_response(func, pool, data, metrics)
+        data['return'] = pool(
+            call, data.get('args', ()), data.get('kwargs', {})
+        )
+        if edit_cache:
+            edit_cache.clear()
+        if metrics:
+            metrics.observe_errors(data['return'])
         return jsonify(data)
 
-    return func_handler
+    handler = func_handler
+    if cache and not stream:
+        handler = functools.partial(_cached_response, cache, handler)
+    if metrics:
+        handler = functools.partial(_metered_response, metrics, handler)
+    return handler
 
 
 def _add_rule(add_rule, *args, **kwargs):
@@ -128,8 +661,79 @@ def stack_func_rules(dsp, rule='/', edit_data=False, depth=-1,
         )
 
 
+def resolve_func_rule(dsp, path, edit_data=False):
+    """
+    Resolves the function of a node path, as it is stacked by
+    :func:`stack_func_rules` (with unlimited depth).
+
+    :param dsp:
+        A dispatcher that identifies the model adopted.
+    :type dsp: schedula.Dispatcher
+
+    :param path:
+        Node ids from the top dispatcher.
+    :type path: tuple[str]
+
+    :param edit_data:
+        Resolve data node paths to set their values?
+    :type edit_data: bool
+
+    :return:
+        The function of the node path or None if the path is not a rule.
+    :rtype: function | None
+    """
+    if not path:
+        return dsp.dispatch
+    last = len(path) - 1
+    for i, k in enumerate(path):
+        node = dsp.nodes.get(k)
+        if node is None:
+            return None
+        elif node['type'] == 'data':
+            if i == last and edit_data:
+                return functools.partial(dsp.set_default_value, k)
+            return None
+        elif node['type'] == 'function':
+            if 'function' not in node:
+                return None
+            f = node['function']
+            if i == last:
+                return f
+            f = parent_func(f)
+            if not isinstance(f, SubDispatch):
+                return None
+            dsp = f.dsp
+        elif i == last:  # Sub-dispatcher nodes have not a rule.
+            return None
+        else:
+            dsp = node['function']
+
+
+def _add_lazy_rules(dsp, app, rule, edit_data, func_handler_maker,
+                    cache_size=4096, **options):
+    from flask import abort
+
+    @functools.lru_cache(cache_size)
+    def _handler(path):
+        func = resolve_func_rule(dsp, path, edit_data)
+        return func and func_handler_maker(func)
+
+    def lazy_handler(node_path=''):
+        handler = _handler(tuple(node_path.strip('/').split('/')))
+        if handler is None:
+            abort(404)
+        return handler()
+
+    app.add_url_rule(rule, rule, func_handler_maker(dsp.dispatch), **options)
+    app.add_url_rule(
+        '%s<path:node_path>' % rule, '%s<path>' % rule, lazy_handler,
+        **options
+    )
+
+
 def add_dsp_url_rules(dsp, app, rule, edit_data=False, methods=('POST',),
-                      func_handler_maker=_func_handler_maker, **options):
+                      func_handler_maker=_func_handler_maker, stream=False,
+                      lazy=False, **options):
     """
     Add url-rules derived from the given dispatcher to a given Flask app.
 
@@ -157,12 +761,30 @@ def add_dsp_url_rules(dsp, app, rule, edit_data=False, methods=('POST',),
         A function that return a function call handler.
     :type func_handler_maker: function, optional
 
+    :param stream:
+        Stream the dispatch responses as newline-delimited JSON records (one
+        `{"id": ..., "value": ...}` per data node as soon as it is computed)
+        followed by a summary `{"done": true, "errors": {...}}`? The
+        `func_handler_maker` has to accept the `stream` keyword.
+    :type stream: bool, optional
+
+    :param lazy:
+        Add a single catch-all rule that resolves the node paths on demand
+        (see :func:`resolve_func_rule`) instead of a rule for each node?
+    :type lazy: bool, optional
+
     :param options:
         Options to be forwarded to the underlying Rule object.
     :type options: dict, optional
     """
 
     options['methods'] = methods
+    if stream:
+        func_handler_maker = functools.partial(func_handler_maker, stream=True)
+    if lazy:
+        _add_lazy_rules(dsp, app, rule, edit_data, func_handler_maker,
+                        **options)
+        return
     add_rule = functools.partial(_add_rule, app.add_url_rule)
     for r, func in stack_func_rules(dsp, rule, edit_data):
         add_rule(r, r, func_handler_maker(func), **options)
@@ -74,6 +74,7 @@ setup(
         'regex',
         'openpyxl>=2.4.0',
         'flask',
+        'numpy',
         'pycel'
     ],
     dependency_links=[
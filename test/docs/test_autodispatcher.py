@@ -1,4 +1,6 @@
+import re
 import unittest
+import unittest.mock as mock
 from schedula import Dispatcher
 from schedula.ext.dsp_directive import DispatcherDirective, PLOT
 from docutils.statemachine import ViewList
@@ -59,9 +61,12 @@ def assert_equal_items(test, items):
     items = list(reversed(items))
     it = iter(directive.result)
     while items:
-        item = items.pop()
-        test.assertEqual(item, next(it), 'item %r not found in result or not in'
-                                         ' the correct order' % item)
+        item, res = items.pop(), next(it)
+        msg = 'item %r not found in result or not in the correct order' % item
+        if isinstance(item, type(re.compile(''))):
+            test.assertRegex(res, item, msg)
+        else:
+            test.assertEqual(item, res, msg)
     del directive.result[:]
 
 
@@ -76,6 +81,14 @@ class TestDispatcherDirective(unittest.TestCase):
         global app
         app.cleanup()
 
+    def test_parallel_safe(self):
+        from docutils.parsers.rst import directives
+        from schedula.ext.dsp_directive import setup
+        with mock.patch.dict(directives._directives):
+            meta = setup(mock.MagicMock())
+        self.assertTrue(meta['parallel_read_safe'])
+        self.assertTrue(meta['parallel_write_safe'])
+
     def test_format_signature(self):
         setup_test()
 
@@ -157,7 +170,8 @@ class TestDispatcherDirective(unittest.TestCase):
               "    >>> s = Dispatcher(name='Dispatcher')",
               "    >>> f = s.add_function('fun', fun2, ['a'], ['b'])",
               '   ', '   ', '   ',
-              '   .. graphviz:: _build/_dispatchers/dispatcher-41dfbb6d292c8abba905c15874724d3d9d3a3b0d.gv',
+              re.compile(r'^   \.\. graphviz:: _build/_dispatchers/'
+                         r'dispatcher-[0-9a-f]{40}\.gv$'),
               '   ',
               "   .. csv-table:: **Dispatcher's data**",
               '   ',
@@ -171,6 +185,10 @@ class TestDispatcherDirective(unittest.TestCase):
         directive.env.ref_context['py:module'] = __name__
         assert_result(self, res, 'dispatcher', 's')
 
+        # Unchanged dispatchers are not rendered again.
+        with mock.patch('schedula.utils.drw.SiteMap.render',
+                        side_effect=AssertionError):
+            assert_result(self, res, 'dispatcher', 's')
 
     def test_generate(self):
         setup_test()
@@ -193,7 +211,8 @@ class TestDispatcherDirective(unittest.TestCase):
             '   ',
             '   good',
             '   ',
-            '   .. graphviz:: _build/_dispatchers/dispatcher-cca2a722432426abafca076a7ccfde40b7bae49b.gv',
+            re.compile(r'^   \.\. graphviz:: _build/_dispatchers/'
+                         r'dispatcher-[0-9a-f]{40}\.gv$'),
             '   ',
             "   .. csv-table:: **Pippo's data**",
             '   ',
@@ -0,0 +1,93 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from schedula.ext import autosummary
+
+
+class TestAutosummary(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        sys.path.insert(0, self.dir)
+        self.module = os.path.join(self.dir, 'autosummary_mod.py')
+        with open(self.module, 'w') as f:
+            f.write('"""Module."""\n')
+        self.source = os.path.join(self.dir, 'index.rst')
+        with open(self.source, 'w') as f:
+            f.write('.. autosummary::\n   :toctree: gen\n\n   autosummary_mod\n')
+        self.imported = []
+        self.import_by_name = autosummary.import_by_name
+
+        def import_by_name(name):
+            self.imported.append(name)
+            return self.import_by_name(name)
+
+        autosummary.import_by_name = import_by_name
+
+    def tearDown(self):
+        for name in ('autosummary_mod', 'autosummary_base'):
+            sys.modules.pop(name, None)
+        autosummary.import_by_name = self.import_by_name
+        sys.path.remove(self.dir)
+        shutil.rmtree(self.dir)
+
+    def generate(self, **kwargs):
+        del self.imported[:]
+        autosummary.generate_autosummary_docs(
+            [self.source], info=lambda msg: None, **kwargs
+        )
+        return self.imported
+
+    def test_incremental(self):
+        stub = os.path.join(self.dir, 'gen', 'autosummary_mod.rst')
+        self.assertEqual(self.generate(), ['autosummary_mod'])
+        self.assertTrue(os.path.isfile(stub))
+        self.assertEqual(self.generate(), [])  # Unchanged.
+
+        with open(self.module, 'a') as f:
+            f.write('a = 1\n')
+        self.assertEqual(self.generate(), ['autosummary_mod'])
+
+        with open(stub, 'w') as f:  # Stubs not generated are kept.
+            f.write('Custom\n')
+        os.remove(os.path.join(self.dir, 'gen', '.autosummary.json'))
+        self.assertEqual(self.generate(), [])
+        with open(stub) as f:
+            self.assertEqual(f.read(), 'Custom\n')
+
+    def test_template_changed(self):
+        stub = os.path.join(self.dir, 'gen', 'autosummary_mod.rst')
+        template = os.path.join(self.dir, 'templates', 'autosummary',
+                                'module.rst')
+        os.makedirs(os.path.dirname(template))
+        with open(template, 'w') as f:
+            f.write('Old {{ fullname }}\n')
+        template_dir = os.path.dirname(os.path.dirname(template))
+        self.assertEqual(self.generate(template_dir=template_dir),
+                         ['autosummary_mod'])
+        self.assertEqual(self.generate(template_dir=template_dir), [])
+
+        with open(template, 'w') as f:
+            f.write('New {{ fullname }}\n')
+        self.assertEqual(self.generate(template_dir=template_dir),
+                         ['autosummary_mod'])
+        with open(stub) as f:
+            self.assertEqual(f.read(), 'New autosummary_mod')
+
+    def test_inherited_changed(self):
+        base = os.path.join(self.dir, 'autosummary_base.py')
+        with open(base, 'w') as f:
+            f.write('class Base(object):\n    def a(self):\n        pass\n')
+        with open(self.module, 'a') as f:
+            f.write('from autosummary_base import Base\n\n\n'
+                    'class Child(Base):\n    pass\n')
+        with open(self.source, 'w') as f:
+            f.write('.. autosummary::\n   :toctree: gen\n\n'
+                    '   autosummary_mod.Child\n')
+        self.assertEqual(self.generate(), ['autosummary_mod.Child'])
+        self.assertEqual(self.generate(), [])
+
+        with open(base, 'a') as f:
+            f.write('    def b(self):\n        pass\n')
+        self.assertEqual(self.generate(), ['autosummary_mod.Child'])
@@ -6,6 +6,7 @@
 # You may not use this work except in compliance with the Licence.
 # You may obtain a copy of the Licence at: http://ec.europa.eu/idabc/eupl
 
+import copy
 import doctest
 import timeit
 import unittest
@@ -310,6 +311,46 @@ class TestCreateDispatcher(unittest.TestCase):
 
         self.assertEqual(dsp.dmap.node, res)
 
+    def test_load_from_lists_bulk(self):
+        def fun(a, b):
+            return a + b
+
+        data_list = [{'data_id': 'a', 'default_value': 0}, {}, {'data_id': 'fun'}]
+        fun_list = [
+            {'function': fun, 'inputs': ['a', 'b'], 'outputs': ['fun']},
+            {'function': fun, 'inputs': ['a', 'fun'], 'outputs': ['c']},
+            {'function_id': 'c', 'inputs': ['a']},
+            {'function': fun, 'inputs': ['c', 'b'], 'outputs': ['d'],
+             'inp_weight': {'c': 2}, 'out_weight': {'d': 3}},
+        ]
+        dsp_list = [{
+            'dsp': {'fun_list': [{'function': fun, 'inputs': ['a', 'b'],
+                                  'outputs': ['c']}]},
+            'inputs': {'a': 'a', 'b': 'b'}, 'outputs': {'c': 'e'}
+        }]
+
+        dsp, bulk_dsp = Dispatcher(), Dispatcher()
+        res = dsp.add_from_lists(data_list, fun_list, dsp_list)
+        bulk_res = bulk_dsp.add_from_lists(data_list, fun_list, dsp_list, True)
+        self.assertEqual(res, bulk_res)
+        self.assertEqual(res[1], ['fun<0>', 'fun<1>', 'c<0>', 'fun<2>'])
+        self.assertEqual(list(dsp.nodes), list(bulk_dsp.nodes))
+        self.assertEqual(dsp.dmap.edges(data=True),
+                         bulk_dsp.dmap.edges(data=True))
+        self.assertEqual(dsp.default_values, bulk_dsp.default_values)
+        for k, v in dsp.nodes.items():
+            v, bv = v.copy(), bulk_dsp.nodes[k].copy()
+            self.assertEqual(v.pop('function', None) is None,
+                             bv.pop('function', None) is None)
+            self.assertEqual(v, bv)
+
+        fun_list = [{'function_id': 'f', 'inputs': ['a'], 'outputs': ['g']},
+                    {'function_id': 'h', 'inputs': ['f'], 'outputs': ['i']}]
+        dsp = Dispatcher()
+        self.assertRaises(ValueError, dsp.add_from_lists, None, fun_list,
+                          None, True)
+        self.assertEqual(dsp.nodes, {})
+
     def test_set_default_value(self):
         dsp = Dispatcher()
 
@@ -342,6 +383,55 @@ class TestCreateDispatcher(unittest.TestCase):
         self.assertIsNot(self.sub_dsp.dmap.node, dsp.dmap.node)
         self.assertIsNot(self.sub_dsp.dmap.edge, dsp.dmap.edge)
 
+    def test_search_node_description(self):
+        def f(x):
+            """
+            :param x:
+                Input value.
+            :type x: float
+            """
+            return x
+
+        def g(x):
+            """
+            :return:
+                Output value.
+            """
+            return x
+
+        dsp = self.sub_dsp
+        dsp.add_function(function=f, inputs=['d'], outputs=['g'])
+        self.assertEqual(dsp.search_node_description('d'),
+                         ('Input value.', ''))
+        self.assertEqual(dsp.search_node_description('d', 'value_type'),
+                         ('float', ''))
+        index = dsp._des_index[1]
+        self.assertIn(('d', 'description'), index)
+
+        dsp.nodes['d']['description'] = 'New value.'  # Attribute changed.
+        self.assertEqual(dsp.search_node_description('d')[0], 'New value.')
+
+        dsp.add_data('a', description='Changed.')  # Structure changed.
+        self.assertEqual(dsp.search_node_description('a')[0], 'Changed.')
+        self.assertIsNot(dsp._des_index[1], index)
+
+        index = dsp._des_index[1]
+        Dispatcher().add_data('a')  # Other dispatchers are independent.
+        dsp.search_node_description('a')
+        self.assertIs(dsp._des_index[1], index)
+        self.assertNotIn('_des_index', dsp.__getstate__())
+        self.assertNotIn('_des_index', copy.deepcopy(dsp).__dict__)
+
+        sub_dsp = Dispatcher()
+        sub_dsp.add_data('a')
+        sub_dsp.add_data('b')
+        dsp = Dispatcher()
+        dsp.add_dispatcher(sub_dsp, inputs={'a': 'a'}, outputs={'b': 'c'})
+        self.assertEqual(dsp.search_node_description('c'), ('', ''))
+        sub_dsp.add_function(function=g, inputs=['a'], outputs=['b'])
+        self.assertEqual(dsp.search_node_description('c'),
+                         ('Output value.', ''))
+
 
 class TestSubDMap(unittest.TestCase):
     def setUp(self):
@@ -1510,3 +1600,19 @@ class TestPipe(unittest.TestCase):
         e = 'Failed DISPATCHING \'dict\' due to:\n  ' \
             'TypeError("\'int\' object is not iterable",)'
         self.assertEqual(e, n['sub_pipe']['dict']['error'])
+
+    def test_pipe_cache(self):
+        from schedula.utils.alg import get_full_pipe
+        sol = self.sol
+        pipe = sol.pipe
+        self.assertEqual(list(pipe), list(get_full_pipe(sol)))
+        pipe.clear()  # The returned pipe is a copy.
+        self.assertEqual(list(sol.pipe), list(get_full_pipe(sol)))
+
+        sub_sol = sol.sub_sol[sol.index + sol.nodes['sub_dsp']['index']]
+        self.assertEqual(sub_sol.full_name, ('sub_dsp',))
+        self.assertIs(sub_sol.full_name, sub_sol.full_name)  # Cached.
+        sol.parent = ('model', Solution())  # Names are not stale.
+        self.assertEqual(sub_sol.full_name, ('model', 'sub_dsp'))
+        sol.parent[1].parent = ('root', Solution())
+        self.assertEqual(sub_sol.full_name, ('root', 'model', 'sub_dsp'))
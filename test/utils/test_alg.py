@@ -11,7 +11,7 @@ import unittest
 
 from networkx.classes.digraph import DiGraph
 
-from schedula.utils.alg import get_sub_node
+from schedula.utils.alg import get_sub_node, update_version
 from schedula.utils.dsp import SubDispatch, SubDispatchFunction
 from schedula import Dispatcher
 from schedula.utils.cst import SINK
@@ -179,6 +179,29 @@ class TestDispatcherGetSubNode(unittest.TestCase):
         self.assertRaises(ValueError, get_sub_node, dsp, ('dispatch', 'b', 'c'))
         self.assertRaises(ValueError, get_sub_node, dsp, ('dispatch', 'e'))
 
+    def test_fuzzy_get_sub_node(self):
+        dsp = Dispatcher()
+        dsp.add_function('max speed', max, ['speed', 'x'], ['y'])
+        o, p = get_sub_node(dsp, ('max spe',), node_attr='type')
+        self.assertEqual((o, p), ('function', ('max speed',)))
+        o, p = get_sub_node(dsp, ('spee',), node_attr='type')
+        self.assertEqual(p, ('max speed',))  # First in sorted order.
+
+        dsp.add_data('a speed')  # The index is rebuilt.
+        self.assertEqual(get_sub_node(dsp, ('spee',), 'type')[1],
+                         ('a speed',))
+        self.assertEqual(get_sub_node(dsp, ('y',), 'type')[1], ('y',))
+        self.assertRaises(ValueError, get_sub_node, dsp, ('speedy',))
+        self.assertRaises(TypeError, get_sub_node, dsp, (5,))
+
+        # Same number of nodes, but a different version.
+        dsp.dmap.remove_node('a speed')
+        dsp.dmap.add_node('b speed', type='data')
+        update_version(dsp)
+        self.assertEqual(get_sub_node(dsp, ('spee',), 'type')[1],
+                         ('b speed',))
+        self.assertNotIn('_node_index', dsp.__getstate__())
+
     def test_full_name(self):
         sol = self.sol
         v = sol.workflow.node['dispatch']['solution']
@@ -94,6 +94,164 @@ class TestDispatcherDraw(unittest.TestCase):
         smap.render(directory=filename)
         self.assertIsInstance(smap, SiteMap)
 
+    def test_render_workers(self):
+        import os
+        from unittest import mock
+        files, smap = [], self.dsp.plot(view=False)
+        for workers in (None, 4):
+            directory, contents = tempfile.mkdtemp(), {}
+            smap.render(directory=directory, workers=workers)
+            for p, _, fs in os.walk(directory):
+                for f in fs:
+                    with open(osp.join(p, f), 'rb') as file:
+                        key = osp.relpath(file.name, directory)
+                        contents[key] = file.read()
+            files.append(contents)
+        self.assertEqual(files[0], files[1])
+
+        with mock.patch.object(SiteMap, 'render') as render:
+            self.dsp.plot(workers=4)
+        self.assertEqual(render.call_args[1]['workers'], 4)
+
+    def test_render_cache(self):
+        import os
+        cache_dir = tempfile.mkdtemp()
+        smap = self.dsp.plot(view=False)
+        smap.render(directory=tempfile.mkdtemp(), cache_dir=cache_dir)
+        cached = sorted(os.listdir(cache_dir))
+        self.assertTrue(cached)
+        directory = tempfile.mkdtemp()
+        smap.render(directory=directory, cache_dir=cache_dir)
+        self.assertEqual(sorted(os.listdir(cache_dir)), cached)
+        self.assertTrue(os.listdir(directory))
+
+    def test_render_cache_hit(self):
+        import os
+        from unittest import mock
+        from schedula.utils.drw import DspPlot
+        cache_dir = tempfile.mkdtemp()
+        self.dsp.plot(view=False).render(
+            directory=tempfile.mkdtemp(), cache_dir=cache_dir
+        )
+        cached = sorted(os.listdir(cache_dir))
+        directory = tempfile.mkdtemp()
+        # A separately built sitemap is rendered from the cache only.
+        with mock.patch.object(DspPlot, 'render', side_effect=AssertionError):
+            self.dsp.plot(view=False).render(
+                directory=directory, cache_dir=cache_dir
+            )
+        self.assertEqual(sorted(os.listdir(cache_dir)), cached)
+        self.assertTrue(os.listdir(directory))
+
+    def test_lazy_site(self):
+        from schedula.utils.drw import SiteFolder
+        smap = self.dsp.plot(view=False, lazy=True)
+        folders = [n for n, e in smap.rules() if isinstance(n, SiteFolder)]
+        self.assertEqual(len(folders), 1)
+        rules = self.dsp.plot(view=False).rules()
+        files = [f for (n, e), f in rules.items()
+                 if e is None and not isinstance(n, SiteFolder)]
+        client = smap.app(lazy=True).test_client()
+        for f in files:
+            if f.count('/') > 1:
+                res = client.get('/%s' % f)
+                self.assertEqual(res.status_code, 200)
+        self.assertEqual(client.get('/unknown.svg').status_code, 404)
+        smap.expand()
+        self.assertEqual(list(smap.rules().values()), list(rules.values()))
+
+    def test_lazy_site_pages(self):
+        from unittest import mock
+        from schedula.utils.drw import SiteFolder, DspPlot
+        folders = [f for (n, e), f in self.dsp.plot(view=False).rules().items()
+                   if e is None and isinstance(n, SiteFolder)]
+        smap = self.dsp.plot(view=False, lazy=True)
+        client = smap.app(lazy=True, maxsize=1).test_client()
+        with mock.patch.object(DspPlot, 'pipe', return_value=b'<svg/>') as pipe:
+            for f, calls in ((folders[0], 1), (folders[0], 1),
+                             (folders[1], 2), (folders[0], 3)):
+                res = client.get('/%s' % f)
+                self.assertEqual(res.data, b'<svg/>')
+                self.assertEqual(pipe.call_count, calls)  # LRU of 1 page.
+
+        with mock.patch.object(SiteMap, 'render') as render, \
+                mock.patch.object(SiteMap, 'site') as site:
+            smap = self.dsp.plot(lazy=True)
+        self.assertFalse(render.called)
+        self.assertTrue(site.call_args[1]['lazy'])
+        self.assertIs(smap._site, site.return_value)
+
+    def test_render_bounded(self):
+        import numpy as np
+        from schedula.utils.drw import FolderNode, SiteNode
+        node = FolderNode(None, 'a', {})
+        self.assertTrue(node.render_size(list(range(10))))
+        self.assertFalse(node.render_size(list(range(10 ** 6))))
+        self.assertFalse(node.render_size({i: i for i in range(10 ** 6)}))
+        out = {'a': np.zeros((1000, 1000)), 'b': [1, 2]}
+        self.assertTrue(node.render_size(out))
+        self.assertEqual(
+            node.render_value(out),
+            "{'a': <ndarray shape=(1000, 1000) dtype=float64>, 'b': [1, 2]}"
+        )
+        text = SiteNode(None, 'a', list(range(10 ** 6))).render()
+        self.assertTrue(text.endswith('...(900000 more)]'))
+
+        import collections
+        from schedula.utils.sol import Solution
+        sol = Solution()
+        sol.update((i, i) for i in range(1000))
+        for out in (collections.OrderedDict(sol), sol, range(1000),
+                    collections.defaultdict(list, sol)):
+            node = SiteNode(None, 'a', out)
+            node.max_items = 10
+            self.assertIn('...(990 more)', node.render())
+
+    def test_link_id(self):
+        from schedula.utils.drw import _link_id
+        empty, links = lambda: iter(()), lambda: iter([('a', 1), ('b', 2)])
+        self.assertIsNone(_link_id([('-', links), ('*', empty)]))
+        self.assertEqual(_link_id([('-', empty), ('*', links)]), 'a')
+        self.assertIsNone(_link_id([('-', links)]))
+
+    def test_max_nodes(self):
+        from schedula.utils.drw import SiteFolder
+        dsp = Dispatcher(name='big')
+        for i in range(50):
+            dsp.add_function('f%d' % i, lambda x: x, ['a%d' % i],
+                             ['a%d' % (i + 1)])
+        for i in range(20):
+            dsp.add_function('g%d' % i, lambda x: x, ['a50'], ['b%d' % i])
+        smap = dsp.plot(view=False, max_nodes=10)
+        self.assertEqual(len(next(iter(smap)).nodes), 7)
+        folders = [n for n, e in smap.rules() if isinstance(n, SiteFolder)]
+        for folder in folders:
+            self.assertLessEqual(len(folder.nodes), 10)
+            ids = {n.id for n in folder.nodes}
+            for edge in folder.edges:
+                self.assertTrue(set(edge.attr['dot_ids']).issubset(ids))
+        nodes = [n for f in folders for n in f.nodes if n.type != 'aggregate']
+        self.assertEqual(len({n.node_id for n in nodes}), len(dsp.nodes))
+
+    def test_json(self):
+        import json
+        directory = tempfile.mkdtemp()
+        smap = self.dsp.plot(view=False, ext='json')
+        fpath = smap.render(directory=directory)
+        self.assertTrue(osp.isfile(osp.join(directory, 'viewer.html')))
+        context = smap.rules()
+        for (node, extra), f in context.items():
+            if f.endswith('.json'):
+                with open(osp.join(directory, f), encoding='utf-8') as file:
+                    data = json.load(file)
+                self.assertEqual(data, node.json(context))
+                ids = {n['id'] for n in data['nodes']}
+                self.assertEqual(len(ids), len(node.nodes))
+                for e in data['edges']:
+                    self.assertTrue({e['source'], e['target']}.issubset(ids))
+        with open(fpath, encoding='utf-8') as file:
+            self.assertIn('viewer.html?src=', file.read())
+
     @unittest.skipIf(PLATFORM != 'windows', 'Your sys can open long path file.')
     def test_view_long_path(self):
         dsp = self.dsp
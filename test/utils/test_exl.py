@@ -8,12 +8,23 @@
 
 from __future__ import division, print_function, unicode_literals
 
-from schedula.utils.exl import extract_dsp_from_excel
+from schedula.utils.exl import extract_dsp_from_excel, Recalculator
 import doctest
 import unittest
+import os
 import os.path as osp
 
 
+class TestDoctest(unittest.TestCase):
+    def runTest(self):
+        import schedula.utils.exl.recalc as recalc
+        failure_count, test_count = doctest.testmod(
+            recalc, optionflags=doctest.NORMALIZE_WHITESPACE
+        )
+        self.assertGreater(test_count, 0, (failure_count, test_count))
+        self.assertEqual(failure_count, 0, (failure_count, test_count))
+
+
 class TestUtils(unittest.TestCase):
     def test_extract_dsp_from_excel(self):
         import logging
@@ -47,4 +58,155 @@ class TestUtils(unittest.TestCase):
               'Sheet1!D3, sqrt(eval_cell("Sheet1!D2"))\',)'
         self.assertEqual(sol._errors['=SQRT(D2)'], msg)
 
-        self.assertNotIn('Sheet2!A1', sol)
\ No newline at end of file
+        self.assertNotIn('Sheet2!A1', sol)
+
+    def test_extract_dsp_from_excel_read_only(self):
+        import logging
+        logging.getLogger('pycel').setLevel(logging.WARNING)
+        filename = osp.join(osp.dirname(__file__), 'example.xlsx')
+        sol = extract_dsp_from_excel(filename)[0].dispatch()
+        for processes in (None, 2):
+            res = extract_dsp_from_excel(
+                filename, read_only=True, processes=processes
+            )[0].dispatch()
+            self.assertEqual(set(sol), set(res))
+            for k, v in sol.items():
+                self.assertEqual(str(v), str(res[k]))
+            self.assertEqual(sol._errors, res._errors)
+
+    def test_recalculator(self):
+        import logging
+        logging.getLogger('pycel').setLevel(logging.WARNING)
+        filename = osp.join(osp.dirname(__file__), 'example.xlsx')
+        dsp = extract_dsp_from_excel(filename)[0]
+        calc = Recalculator(dsp)
+        changed = calc.set_inputs({'Sheet1!A1': 2})
+        sol = dsp.dispatch(inputs={'Sheet1!A1': 2})
+
+        self.assertIn('Sheet1!B1', changed)
+        self.assertNotIn('Sheet1!B5', changed)
+        self.assertEqual(set(calc.values), set(sol))
+        for k, v in sol.items():
+            self.assertEqual(str(v), str(calc.values[k]))
+        self.assertEqual(calc.errors, sol._errors)
+
+    def test_evaluate_scenarios(self):
+        import logging
+        logging.getLogger('pycel').setLevel(logging.WARNING)
+        filename = osp.join(osp.dirname(__file__), 'example.xlsx')
+        dsp = extract_dsp_from_excel(filename)[0]
+        scenarios = {'Sheet1!A1': [1, 2, 3], 'Sheet1!A2': [0, -1, 5]}
+        res = Recalculator(dsp).evaluate_scenarios(scenarios)
+        for i in range(3):
+            sol = dsp.dispatch(inputs={k: v[i] for k, v in scenarios.items()})
+            for k, v in res.items():
+                if v[i] is None:
+                    self.assertNotIn(k, sol)
+                else:
+                    self.assertEqual(str(v[i]), str(sol[k]))
+
+    def test_load_dsp_from_excel(self):
+        import logging
+        import tempfile
+        import shutil
+        from schedula.utils.exl import load_dsp_from_excel
+        logging.getLogger('pycel').setLevel(logging.WARNING)
+        filename = osp.join(osp.dirname(__file__), 'example.xlsx')
+        seeds = extract_dsp_from_excel(filename)[1]
+        cache_dir = tempfile.mkdtemp()
+        try:
+            d1, formulas1 = load_dsp_from_excel(filename, cache_dir)
+            d2, formulas2 = load_dsp_from_excel(filename, cache_dir)
+        finally:
+            shutil.rmtree(cache_dir)
+        self.assertEqual({k: v[1] for k, v in seeds.items()}, formulas1)
+        self.assertEqual(formulas1, formulas2)
+        sol1, sol2 = d1.dispatch(), d2.dispatch()
+        self.assertEqual(set(sol1), set(sol2))
+        self.assertEqual(sol1._errors, sol2._errors)
+        self.assertEqual(sol2['Sheet2!A1'], 680)
+
+    def test_load_cache_corrupted(self):
+        import tempfile
+        from schedula.utils.exl import _load_cache
+        with tempfile.NamedTemporaryFile(delete=False) as f:
+            f.write(b'not a dill file')
+        try:
+            self.assertIsNone(_load_cache(f.name))
+        finally:
+            os.remove(f.name)
+
+
+class _Cell(object):
+    def __init__(self, python_expression):
+        self.python_expression = python_expression
+        self.compiled_expression = compile(python_expression, '<cell>', 'eval')
+
+    def address(self):
+        return 'S!C1'
+
+
+class TestCellFunction(unittest.TestCase):
+    def test_compiled_vs_interpreted(self):
+        import numpy as np
+        from schedula.utils.exl.core import CellFunction, evaluate_cell
+        inputs = ['S!A1', 'S!A2:B2']
+        for expr, args in (
+                ('eval_cell("S!A1") * 2', (3, None)),
+                ('eval_cell("S!A1") + len("eval_cell(\\"S!A2:B2\\")")',
+                 (3, None)),
+                ('xsum(eval_range("S!A2:B2")) - eval_cell("S!A1")',
+                 (1, np.array([2, 3]))),
+                ('index(eval_range("S!A2:B2"), 2)', (1, np.array([2, 3])))):
+            cell = _Cell(expr)
+            self.assertEqual(CellFunction(cell, inputs)(*args),
+                             evaluate_cell(cell, inputs, *args), expr)
+
+    def test_unresolved(self):
+        from schedula.utils.exl.core import CellFunction
+        func = CellFunction(_Cell('eval_cell("S!B1") + 1'), ['S!A1'])
+        with self.assertRaisesRegex(ValueError, 'Unresolved reference S!B1'):
+            func(1)
+
+
+class _Range(object):
+    def __init__(self, celladdrs):
+        self.celladdrs = celladdrs
+        self.nrows = len(celladdrs) if isinstance(celladdrs[0], list) else 1
+        self.ncols = len(celladdrs[0]) if self.nrows > 1 else len(celladdrs)
+
+
+class TestVectorized(unittest.TestCase):
+    def test_vectorized_vs_scalar(self):
+        from pycel import excellib
+        from schedula.utils.exl import core
+        rng = _Range([['A1', 'B1'], ['A2', 'B2']])
+        func = core.RangeFunction(rng, core.range_inputs(rng))
+        for values in ((1, 2, 3, 4), (1.5, -2, 3, 4), (True, 2, 3, False),
+                       (1, 'a', 3, None)):
+            rng = func(*values)
+            for name in ('xsum', 'average', 'xmax', 'xmin', 'count'):
+                self.assertEqual(
+                    getattr(core, name)(rng, 2),
+                    getattr(excellib, name)(rng.tolist(), 2), (name, values)
+                )
+        rng = _Range(['A1', 'A2', 'A3'])
+        func = core.RangeFunction(rng, core.range_inputs(rng))
+        for values in ((1, 2, 3), (1.5, -2, 3)):
+            a, b = func(*values), func(*values[::-1])
+            self.assertEqual(core.sumproduct(a, b),
+                             excellib.sumproduct(a.tolist(), b.tolist()))
+
+    def test_not_vectorized(self):
+        from schedula.utils.exl import core
+        rng = _Range(['A1', 'A2', 'A3'])
+        func = core.RangeFunction(rng, core.range_inputs(rng))
+        self.assertEqual(core.match(3, func(1, 2, 3), 0), 3)
+        self.assertEqual(core.match(2.5, func(1, 2, 3)), 2)
+        self.assertEqual(core.match('b', func('a', 'b', 'c'), 0), 2)
+        rng = _Range([['A1', 'B1'], ['A2', 'B2']])
+        func = core.RangeFunction(rng, core.range_inputs(rng))
+        table = func(1, 'x', 2, 'y')
+        self.assertEqual(core.index(table, 2, 2), 'y')
+        if hasattr(core, 'vlookup'):
+            self.assertEqual(core.vlookup(2, table, 2), 'y')
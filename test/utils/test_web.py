@@ -0,0 +1,252 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+#
+# Copyright 2014-2016 European Commission (JRC);
+# Licensed under the EUPL (the 'Licence');
+# You may not use this work except in compliance with the Licence.
+# You may obtain a copy of the Licence at: http://ec.europa.eu/idabc/eupl
+
+import json
+import threading
+import unittest
+from schedula import Dispatcher
+from schedula.utils.dsp import SubDispatch
+
+
+class TestWeb(unittest.TestCase):
+    def setUp(self):
+        sub_dsp = Dispatcher(name='sub')
+        sub_dsp.add_function('max', max, ['a', 'b'], ['c'])
+
+        dsp = Dispatcher(name='model')
+        dsp.add_data('a', default_value=1)
+        dsp.add_function(
+            'sub', SubDispatch(sub_dsp, ['c'], output_type='list'),
+            ['x'], ['c']
+        )
+        self.event, self.running = threading.Event(), threading.Event()
+
+        def wait(x):
+            self.running.set()
+            self.event.wait(5)
+            return x
+
+        dsp.add_function('wait', wait, ['a'], ['b'])
+        self.dsp = dsp
+
+    def post(self, client, rule, data):
+        res = client.post(rule, data=json.dumps(data))
+        if res.status_code == 200:
+            return res.status_code, json.loads(res.data.decode('utf-8'))
+        return res.status_code, None
+
+    def test_dispatch(self):
+        self.event.set()
+        client = self.dsp.web().test_client()
+        code, res = self.post(client, '/', {'kwargs': {'inputs': {'a': 2}}})
+        self.assertEqual(code, 200)
+        self.assertEqual(res['return'], {'a': 2, 'b': 2})
+
+        code, res = self.post(client, '/sub/', {'args': [{'a': 1, 'b': 3}]})
+        self.assertEqual(res['return'], [3])
+
+    def test_concurrent_requests(self):
+        self.event.set()
+        client = self.dsp.web(workers=4).test_client()
+        results = {}
+
+        def request(i):
+            results[i] = self.post(
+                client, '/sub/', {'args': [{'a': i, 'b': 0}]}
+            )[1]['return']
+
+        threads = [threading.Thread(target=request, args=(i,))
+                   for i in range(20)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(results, {i: [i] for i in range(20)})
+
+    def test_backpressure(self):
+        client = self.dsp.web(workers=1, max_queue=0).test_client()
+        data = {'kwargs': {'inputs': {'a': 2}}}
+        res = []
+        t = threading.Thread(target=lambda: res.append(
+            self.post(client, '/', data)
+        ))
+        t.start()
+        try:
+            self.assertTrue(self.running.wait(5))
+            self.assertEqual(self.post(client, '/', data)[0], 503)
+        finally:
+            self.event.set()
+            t.join()
+        self.assertEqual(res[0][0], 200)
+
+    def test_stopper(self):
+        from schedula.utils.dsp import SubDispatchFunction, SubDispatchPipe
+        self.event.set()
+        sub_dsp = Dispatcher(name='sub', stopper=threading.Event())
+        sub_dsp.add_function('max', max, ['a', 'b'], ['c'])
+        for i, cls in enumerate((SubDispatchFunction, SubDispatchPipe)):
+            func = cls(sub_dsp, 'func', ['a', 'b'], ['c'])
+            self.dsp.add_function('func%d' % i, func, ['a', 'x'], ['y'])
+        sub_dsp.stopper.set()  # Requests have their own stopper.
+        client = self.dsp.web().test_client()
+        for i in range(2):
+            code, res = self.post(client, '/func%d/' % i, {'args': [1, 3]})
+            self.assertEqual((code, res['return']), (200, 3))
+
+    def test_batch(self):
+        self.event.set()
+        for workers in (None, 2):
+            client = self.dsp.web(workers=workers).test_client()
+            data = [{'args': [{'a': i, 'b': 1}]} for i in range(5)]
+            data.append({'args': [{'a': 1}]})
+            code, res = self.post(client, '/sub/', data)
+            self.assertEqual(code, 200)
+            self.assertEqual([r.get('return') for r in res],
+                             [[1], [1], [2], [3], [4], None])
+            self.assertIn('DispatcherError', res[-1]['error'])
+
+            code, res = self.post(client, '/sub/', [
+                [1, 2], {'args': {'a': 1}}, {'args': [{'a': 2, 'b': 1}]}
+            ])
+            self.assertEqual(code, 200)
+            self.assertIn('TypeError', res[0]['error'])
+            self.assertIn('TypeError', res[1]['error'])
+            self.assertEqual(res[2]['return'], [2])
+
+    def test_stream(self):
+        self.event.set()
+        self.dsp.add_function('error', lambda x: 1 / 0, ['b'], ['d'])
+        client = self.dsp.web(stream=True).test_client()
+        res = client.post('/', data=json.dumps({'kwargs': {'inputs': {}}}))
+        self.assertEqual(res.mimetype, 'application/x-ndjson')
+        records = res.data.decode('utf-8').splitlines()
+        records = [json.loads(r) for r in records]
+        self.assertEqual(records[:-1], [
+            {'id': 'a', 'value': 1}, {'id': 'b', 'value': 1}
+        ])
+        self.assertTrue(records[-1]['done'])
+        self.assertEqual(set(records[-1]['errors']), {'error'})
+        self.assertEqual(self.dsp.solution, {})
+
+        code, res = self.post(client, '/sub/', {'args': [{'a': 1, 'b': 3}]})
+        self.assertEqual(res['return'], [3])
+
+    def test_stream_disconnect(self):
+        after = threading.Event()
+        self.dsp.add_function('after', lambda x: after.set(), ['b'], ['d'])
+        client = self.dsp.web(stream=True, metrics=True).test_client()
+        res = client.post('/', data=json.dumps({'kwargs': {'inputs': {}}}),
+                          buffered=False)
+        self.assertTrue(self.running.wait(5))
+        metrics = client.get('/metrics').data.decode('utf-8').splitlines()
+        self.assertIn('schedula_active_requests 1', metrics)
+        res.close()  # The client disconnects without reading the stream.
+        self.event.set()
+        self.assertFalse(after.wait(.5))
+        metrics = client.get('/metrics').data.decode('utf-8').splitlines()
+        self.assertIn('schedula_active_requests 0', metrics)
+        self.assertIn('schedula_request_duration_seconds_count{rule="/"} 1',
+                      metrics)
+
+    def test_lazy(self):
+        import functools
+        from schedula.utils.web import stack_func_rules, resolve_func_rule
+
+        def key(f):
+            if isinstance(f, functools.partial):
+                return f.func, f.args
+            return f
+
+        for r, func in stack_func_rules(self.dsp, '/', True):
+            path = tuple(r.strip('/').split('/')) if r != '/' else ()
+            self.assertEqual(
+                key(resolve_func_rule(self.dsp, path, True)), key(func)
+            )
+        self.assertIsNone(resolve_func_rule(self.dsp, ('sub', 'x'), True))
+        self.assertIsNone(resolve_func_rule(self.dsp, ('a',)))
+
+        self.event.set()
+        client = self.dsp.web(lazy=True).test_client()
+        code, res = self.post(client, '/', {'kwargs': {'inputs': {'a': 2}}})
+        self.assertEqual(res['return'], {'a': 2, 'b': 2})
+        for rule in ('/sub/', '/sub'):
+            code, res = self.post(client, rule, {'args': [{'a': 1, 'b': 3}]})
+            self.assertEqual(res['return'], [3])
+        code, res = self.post(client, '/sub/max/', {'args': [1, 4]})
+        self.assertEqual(res['return'], 4)
+        self.assertEqual(self.post(client, '/unknown/', {})[0], 404)
+
+    def test_cache(self):
+        from schedula.utils.web import ResponseCache, create_flask_app
+        self.event.set()
+        calls = []
+        self.dsp.add_function('count', calls.append, ['a'], ['e'])
+        cache = ResponseCache(maxsize=1)
+        client = create_flask_app(self.dsp, cache=cache).test_client()
+        data = json.dumps({'kwargs': {'inputs': {'a': 2}, 'outputs': ['b']}})
+        data2 = json.dumps({'kwargs': {'outputs': ['b'], 'inputs': {'a': 2}}})
+        res = client.post('/', data=data)
+        etag = res.headers['ETag']
+        self.assertEqual(json.loads(res.data.decode('utf-8'))['return'],
+                         {'a': 2, 'b': 2})
+        self.assertEqual(client.post('/', data=data2).data, res.data)
+        res = client.post('/', data=data, headers={'If-None-Match': etag})
+        self.assertEqual(res.status_code, 304)
+        self.assertEqual(calls, [])
+
+        client.post('/', data=json.dumps({'kwargs': {'inputs': {'a': 3}}}))
+        self.assertEqual(calls, [3])
+        client.post('/', data=data)  # Evicted by LRU.
+        self.assertEqual(len(cache.data), 1)
+
+        cache = ResponseCache(ttl=-1)
+        client = create_flask_app(self.dsp, cache=cache).test_client()
+        data = json.dumps({'kwargs': {'inputs': {'a': 4}}})
+        client.post('/', data=data)
+        client.post('/', data=data)  # Expired.
+        self.assertEqual(calls, [3, 4, 4])
+
+    def test_cache_batch_edit(self):
+        import functools
+        from flask import Flask
+        from schedula.utils.web import ResponseCache, add_dsp_url_rules, \
+            _func_handler_maker
+        self.event.set()
+        app, cache = Flask(__name__), ResponseCache()
+        maker = functools.partial(_func_handler_maker, cache=cache)
+        add_dsp_url_rules(self.dsp, app, '/', edit_data=True,
+                          func_handler_maker=maker)
+        client = app.test_client()
+        data = {'kwargs': {'outputs': ['b']}}
+        self.assertEqual(self.post(client, '/', data)[1]['return'],
+                         {'a': 1, 'b': 1})
+        code, res = self.post(client, '/a/', [{'args': [5]}])
+        self.assertEqual((code, res[0].get('error')), (200, None))
+        self.assertEqual(self.post(client, '/', data)[1]['return'],
+                         {'a': 5, 'b': 5})
+
+    def test_metrics(self):
+        self.event.set()
+        self.dsp.add_function('error', lambda x: 1 / 0, ['b'], ['d'])
+        client = self.dsp.web(metrics=True, max_queue=0).test_client()
+        self.post(client, '/', {'kwargs': {'inputs': {'a': 2}}})
+        self.post(client, '/', [{'kwargs': {'inputs': {'a': 2}}}])
+        self.post(client, '/sub/', {'args': [{'a': 1}]})
+        res = client.get('/metrics')
+        self.assertEqual(res.mimetype, 'text/plain')
+        lines = res.data.decode('utf-8').splitlines()
+        for line in (
+                'schedula_request_duration_seconds_count{rule="/"} 2',
+                'schedula_request_duration_seconds_count{rule="/sub/"} 1',
+                'schedula_request_errors_total{rule="/sub/"} 1',
+                'schedula_active_requests 0',
+                'schedula_node_duration_seconds_count{node="wait"} 2',
+                'schedula_node_duration_seconds_bucket'
+                '{node="wait",le="+Inf"} 2',
+                'schedula_node_errors_total{node="error"} 2'):
+            self.assertIn(line, lines)